@@ -0,0 +1,65 @@
+"""
+Cache-backed buffer for step-by-step answers.
+
+With ``ASSESSMENT_BUFFER_ANSWERS`` on, ``question_view`` stores each answer
+under its own cache key (``assessment id`` + ``question id``) instead of
+writing a ``UserResponse`` row, and ``submit_assessment`` flushes the whole
+assessment with one upsert. Keys belong to the assessment, not the login
+session, so an answer survives a session expiring mid-walk.
+
+Answers are only dropped from the cache after the flush commits, and the
+upsert is idempotent, so a submit that fails half-way can simply be
+retried. Answers lost to cache expiry or eviction show up as unanswered
+questions at submit and are asked again.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+def enabled():
+    return getattr(settings, 'ASSESSMENT_BUFFER_ANSWERS', False)
+
+
+def _key(assessment_id, question_id):
+    return f'assessment:{assessment_id}:answer:{question_id}'
+
+
+def add(assessment, question_id, option):
+    timeout = getattr(settings, 'ASSESSMENT_ANSWER_BUFFER_TTL', 6 * 60 * 60)
+    cache.set(_key(assessment.id, question_id), option, timeout=timeout)
+
+
+def buffered(assessment):
+    """``{question_id: option}`` for the answers currently held for ``assessment``."""
+    keys = {_key(assessment.id, question_id): question_id for question_id in assessment.question_order}
+    return {keys[key]: option for key, option in cache.get_many(keys).items()}
+
+
+def flush(assessment):
+    """Write buffered answers for ``assessment`` to the database; returns how many."""
+    from .models import UserResponse
+
+    answers = buffered(assessment)
+    if answers:
+        keys = [_key(assessment.id, question_id) for question_id in answers]
+        with transaction.atomic():
+            UserResponse.objects.record(assessment, answers)
+            transaction.on_commit(lambda: cache.delete_many(keys))
+    return len(answers)
+
+
+def first_unanswered(assessment):
+    """Index in ``question_order`` of the first question without a saved response, or None."""
+    from .models import Question
+
+    answered = set(assessment.responses.values_list('question_id', flat=True))
+    missing = [question_id for question_id in assessment.question_order if question_id not in answered]
+    if not missing:
+        return None
+    # Questions deleted since the assessment started can no longer be answered
+    existing = set(Question.objects.filter(id__in=missing).values_list('id', flat=True))
+    for question_id in missing:
+        if question_id in existing:
+            return assessment.question_order.index(question_id)
+    return None
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class AssessmentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'assessments'
+
+    def ready(self):
+        from .models import Question
+        from .question_bank import invalidate
+        post_save.connect(invalidate, sender=Question)
+        post_delete.connect(invalidate, sender=Question)
@@ -2,6 +2,8 @@ import csv
 import json
 from django.core.management.base import BaseCommand
 from assessments.models import Question, CareerPath
+from assessments.question_bank import NAMESPACE as QUESTION_BANK
+from core.cache import bump_version
 
 class Command(BaseCommand):
     help = 'Import assessment questions and career paths from CSV files'
@@ -17,6 +19,7 @@ class Command(BaseCommand):
         
         self.import_questions()
         # self.import_careers()
+        bump_version(QUESTION_BANK)
         
         self.stdout.write(self.style.SUCCESS('Import completed!'))
 
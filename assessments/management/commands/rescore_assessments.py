@@ -0,0 +1,118 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from assessments.models import Assessment
+from assessments.scoring import fetch_rows, get_trait_map, score_batch
+from users.models import UserSummary
+
+
+class Command(BaseCommand):
+    help = 'Recompute score and result_data of completed assessments with the current scoring rules'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            type=str,
+            help='Only assessments taken on or after this date (YYYY-MM-DD)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Assessments fetched and written per chunk (default: 2000)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Scoring processes; 1 scores in this process (default: CPU count)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Score and report changes without writing them'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        workers = options['workers']
+        dry_run = options['dry_run']
+
+        queryset = Assessment.objects.filter(status='completed')
+        if options['since']:
+            try:
+                since = datetime.strptime(options['since'], '%Y-%m-%d')
+            except ValueError:
+                raise CommandError('--since must be a date in YYYY-MM-DD format')
+            queryset = queryset.filter(date_taken__gte=timezone.make_aware(since))
+
+        total = queryset.count()
+        self.stdout.write(f'Rescoring {total:,} assessments with {workers} worker(s)'
+                          f'{" (dry run)" if dry_run else ""}...')
+
+        score = partial(score_batch, trait_map=get_trait_map())
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+        processed = 0
+        changed = 0
+        last_id = 0
+        start = time.perf_counter()
+        try:
+            while True:
+                # Keyset pagination: stable and index-only regardless of depth
+                chunk = list(
+                    queryset.filter(id__gt=last_id).order_by('id')
+                    .values_list('id', 'score', 'result_data')[:chunk_size]
+                )
+                if not chunk:
+                    break
+                last_id = chunk[-1][0]
+
+                rows = fetch_rows([assessment_id for assessment_id, _, _ in chunk])
+                batch = [(assessment_id, rows.get(assessment_id, [])) for assessment_id, _, _ in chunk]
+                if executor:
+                    step = -(-len(batch) // workers)
+                    parts = [batch[i:i + step] for i in range(0, len(batch), step)]
+                    scored = [result for part in executor.map(score, parts) for result in part]
+                else:
+                    scored = score(batch)
+
+                current = {assessment_id: (old_score, old_data) for assessment_id, old_score, old_data in chunk}
+                updates = [
+                    Assessment(id=assessment_id, score=new_score, result_data=new_data)
+                    for assessment_id, new_score, new_data in scored
+                    if current[assessment_id] != (new_score, new_data)
+                ]
+                if updates and not dry_run:
+                    scores = {assessment.id: assessment.score for assessment in updates}
+                    summaries = list(UserSummary.objects.filter(latest_assessment_id__in=scores))
+                    for summary in summaries:
+                        summary.latest_score = scores[summary.latest_assessment_id]
+                    with transaction.atomic():
+                        Assessment.objects.bulk_update(updates, ['score', 'result_data'])
+                        UserSummary.objects.bulk_update(summaries, ['latest_score'])
+
+                processed += len(chunk)
+                changed += len(updates)
+                elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f'  {processed:,}/{total:,} processed, {changed:,} changed '
+                    f'({processed / elapsed:,.0f} assessments/sec)'
+                )
+        finally:
+            if executor:
+                executor.shutdown()
+
+        elapsed = time.perf_counter() - start
+        rate = processed / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Rescoring complete!\n'
+            f'  Processed: {processed:,}\n'
+            f'  {"Would change" if dry_run else "Changed"}: {changed:,}\n'
+            f'  Elapsed: {elapsed:.2f}s ({rate:,.0f} assessments/sec)'
+        ))
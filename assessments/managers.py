@@ -0,0 +1,29 @@
+from django.db import models
+
+
+class UserResponseManager(models.Manager):
+    """Writes answers as native upserts on (assessment, question)."""
+
+    def record(self, assessment, answers):
+        """
+        Save ``answers`` (``{question_id: selected_option}``) for ``assessment``.
+
+        One ``INSERT ... ON CONFLICT (assessment_id, question_id) DO UPDATE``
+        for any number of answers, so re-answering a question or a
+        double-submit overwrites the earlier choice instead of racing it.
+        """
+        if not answers:
+            return []
+        return self.bulk_create(
+            [
+                self.model(assessment_id=getattr(assessment, 'pk', assessment),
+                           question_id=question_id, selected_option=option)
+                for question_id, option in answers.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['assessment', 'question'],
+            update_fields=['selected_option'],
+        )
+
+    def record_one(self, assessment, question_id, option):
+        return self.record(assessment, {question_id: option})
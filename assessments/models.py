@@ -1,5 +1,7 @@
 from django.db import models
+from django.db.models import Q
 from users.models import CustomUser
+from .managers import UserResponseManager
 
 class CareerPath(models.Model):
     career_id = models.CharField(max_length=50, unique=True)
@@ -57,6 +59,13 @@ class Assessment(models.Model):
     result_data = models.JSONField(default=dict, blank=True) # Stores the computed analysis
     question_order = models.JSONField(default=list, blank=True) # Stores list of question IDs in order
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'status'], name='assessment_user_status_idx'),
+            # Latest completed assessment per user (.filter(status='completed').last())
+            models.Index(fields=['user', '-id'], condition=Q(status='completed'), name='assessment_user_completed_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.mobile} - {self.date_taken}"
 
@@ -64,6 +73,13 @@ class UserResponse(models.Model):
     assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE, related_name='responses')
     question = models.ForeignKey(Question, on_delete=models.CASCADE)
     selected_option = models.CharField(max_length=255)
+
+    objects = UserResponseManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['assessment', 'question'], name='unique_response_per_question'),
+        ]
     
     def __str__(self):
         return f"{self.assessment.id} - {self.question.id}"
@@ -0,0 +1,73 @@
+"""
+Process-level cache of question ids, bucketed by (category, difficulty).
+
+``start_assessment`` only needs ids to build ``question_order``, so the
+bank never loads question text or options: sampling is a random pick of
+positions in a compact id array. The bank is rebuilt when the
+``assessments.question`` version in ``core.cache`` moves, which happens on
+every Question save/delete and at the end of ``import_assessment_data``, or
+after ``QUESTION_BANK_MAX_AGE`` seconds, whichever comes first (a bump made
+in another process is only seen through a shared cache).
+"""
+import random
+import threading
+import time
+from array import array
+
+from django.conf import settings
+
+from core.cache import bump_version, get_version
+
+NAMESPACE = 'assessments.question'
+
+
+class _Bank:
+    def __init__(self, rows, version):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.buckets = {}
+        self.by_category = {}
+        for pk, category, difficulty in rows:
+            self.buckets.setdefault((category, difficulty), array('q')).append(pk)
+            self.by_category.setdefault(category, array('q')).append(pk)
+
+
+_bank = None
+_lock = threading.Lock()
+
+
+def _stale(bank, version):
+    max_age = getattr(settings, 'QUESTION_BANK_MAX_AGE', 600)
+    return bank is None or bank.version != version or time.monotonic() - bank.built_at >= max_age
+
+
+def get_bank():
+    global _bank
+    version = get_version(NAMESPACE)
+    bank = _bank
+    if _stale(bank, version):
+        from .models import Question
+
+        with _lock:
+            bank = _bank
+            if _stale(bank, version):
+                rows = Question.objects.order_by('id').values_list('id', 'category', 'difficulty')
+                _bank = bank = _Bank(rows.iterator(chunk_size=5000), version)
+    return bank
+
+
+def pick(category, n, difficulty=None):
+    """Return up to ``n`` random question ids of ``category`` (and ``difficulty``)."""
+    bank = get_bank()
+    if difficulty is None:
+        ids = bank.by_category.get(category, ())
+    else:
+        ids = bank.buckets.get((category, difficulty), ())
+    if len(ids) <= n:
+        return list(ids)
+    return [ids[i] for i in random.sample(range(len(ids)), n)]
+
+
+def invalidate(**kwargs):
+    """Signal receiver for Question writes."""
+    bump_version(NAMESPACE)
@@ -0,0 +1,163 @@
+"""
+Assessment scoring engine.
+
+Psychometric questions are matched to traits by their text. That match is
+compiled once per question-bank version into ``{question_id: {option:
+trait}}``, so scoring an assessment is a single pass over rows fetched with
+one joined query. ``score_assessments()`` scores any number of assessments
+with one query per chunk, for re-scoring jobs.
+"""
+import threading
+from collections import defaultdict
+
+from core.cache import get_version
+
+from .question_bank import NAMESPACE as QUESTION_BANK
+
+# Text-to-trait mapping for psychometric questions. Keys are normalized
+# question prefixes matching the question bank.
+PSYCH_MAPPING = {
+    "Which activity do you enjoy more": {
+        "A": "Analytical Thinking",
+        "B": "Verbal & Creative",
+        "C": "Social & Empathetic"
+    },
+    "How do you prefer to work": {
+        "A": "Independent Work Style",
+        "B": "Collaborative Work Style"
+    },
+    "How do you feel about unclear instructions": {
+        "A": "Explorative / Ambiguity Tolerant",
+        "B": "Structured / Process Driven"
+    },
+    "Which tools are you most comfortable with": {
+        "A": "Business & Operations",
+        "B": "Communication & Content",
+        "C": "Technical & Data"
+    },
+    "When learning something new, you prefer": {
+        "A": "Hands-on Learner",
+        "B": "Theoretical Learner",
+        "C": "Social Learner"
+    }
+}
+
+# Tech users answer fewer psychometric questions; these pad their profile.
+TECH_EXTRA_TRAITS = ["Technical Proficiency", "Problem Solving"]
+
+# Reported percentages never go below this floor.
+MIN_SCORE = 70
+
+
+def compile_trait_map(questions):
+    """``(id, text)`` pairs of psychometric questions -> ``{id: {option: trait}}``."""
+    trait_map = {}
+    for question_id, text in questions:
+        text = text.strip().rstrip('?.:')
+        for key, traits in PSYCH_MAPPING.items():
+            if key in text:
+                trait_map[question_id] = traits
+                break
+    return trait_map
+
+
+_trait_map = None
+_lock = threading.Lock()
+
+
+def get_trait_map():
+    """The compiled trait map for the current question bank."""
+    global _trait_map
+    version = get_version(QUESTION_BANK)
+    cached = _trait_map
+    if cached is None or cached[0] != version:
+        from .models import Question
+
+        with _lock:
+            questions = Question.objects.filter(category='psychometric').values_list('id', 'text')
+            _trait_map = cached = (version, compile_trait_map(questions))
+    return cached[1]
+
+
+def _percent(correct, total):
+    return max(int((correct / total) * 100), MIN_SCORE) if total > 0 else 0
+
+
+def score_rows(rows, trait_map):
+    """
+    Score one assessment.
+
+    ``rows`` are ``(question_id, category, correct_option, selected_option)``
+    tuples in answer order. Returns ``(score, result_data)``.
+    """
+    correct = {'technical': 0, 'aptitude': 0}
+    total = {'technical': 0, 'aptitude': 0}
+    traits = []
+
+    for question_id, category, correct_option, selected in rows:
+        if category in total:
+            total[category] += 1
+            if selected == correct_option:
+                correct[category] += 1
+        elif category == 'psychometric':
+            trait = trait_map.get(question_id, {}).get(selected)
+            if trait:
+                traits.append(trait)
+
+    tech_total = total['technical']
+    apt_total = total['aptitude']
+    if tech_total > 0:
+        traits.extend(extra for extra in TECH_EXTRA_TRAITS if extra not in traits)
+
+    total_score = _percent(correct['technical'] + correct['aptitude'], tech_total + apt_total)
+    return total_score, {
+        'tech_score': _percent(correct['technical'], tech_total),
+        'tech_total': tech_total,
+        'apt_score': _percent(correct['aptitude'], apt_total),
+        'apt_total': apt_total,
+        'psych_profile': traits,
+        'total_score': total_score,
+    }
+
+
+def score_batch(batch, trait_map):
+    """``[(assessment_id, rows), ...]`` -> ``[(assessment_id, score, result_data), ...]``.
+
+    Pure function of its arguments, so it can run in a worker process.
+    """
+    return [(assessment_id, *score_rows(rows, trait_map)) for assessment_id, rows in batch]
+
+
+def fetch_rows(assessment_ids):
+    """Response rows for ``assessment_ids`` in one joined query, grouped per assessment."""
+    from .models import UserResponse
+
+    rows = defaultdict(list)
+    responses = UserResponse.objects.filter(assessment_id__in=assessment_ids).order_by('assessment_id', 'id')
+    for assessment_id, *row in responses.values_list(
+        'assessment_id', 'question_id', 'question__category', 'question__correct_option', 'selected_option'
+    ):
+        rows[assessment_id].append(row)
+    return rows
+
+
+def score_assessments(assessment_ids, chunk_size=1000):
+    """Batch API: ``{assessment_id: (score, result_data)}`` for every id."""
+    trait_map = get_trait_map()
+    assessment_ids = list(assessment_ids)
+    results = {}
+    for start in range(0, len(assessment_ids), chunk_size):
+        chunk = assessment_ids[start:start + chunk_size]
+        rows = fetch_rows(chunk)
+        for assessment_id in chunk:
+            results[assessment_id] = score_rows(rows.get(assessment_id, ()), trait_map)
+    return results
+
+
+def score_assessment(assessment):
+    """Score the saved responses and mark ``assessment`` completed."""
+    score, result_data = score_assessments([assessment.id])[assessment.id]
+    assessment.status = 'completed'
+    assessment.score = score
+    assessment.result_data = result_data
+    assessment.save()
@@ -1,3 +1,273 @@
-from django.test import TestCase
+import random
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models import Branch, City, College, State
+from users.models import CustomUser, UserSummary
+from . import answer_buffer, question_bank
+from .models import Assessment, Question, UserResponse
+from .scoring import PSYCH_MAPPING, score_assessment, score_assessments
+
+
+class StartAssessmentTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = CustomUser.objects.create_user(
+            mobile='9000000001', password='x', email='a@example.com', full_name='A',
+            college=College.objects.create(name='College', short_name=''),
+            branch=Branch.objects.create(name='Branch', short_name=''),
+            city=City.objects.create(name='City'), state=State.objects.create(name='State'),
+        )
+        self.client.force_login(user)
+        Question.objects.create(text='Q', options=['A', 'B'], correct_option='A', category='aptitude')
+
+    def start(self, **data):
+        response = self.client.post('/assessment/start/', data)
+        assessment = Assessment.objects.get()
+        return response, assessment.id
+
+    def test_one_question_per_page_by_default(self):
+        response, assessment_id = self.start()
+        self.assertRedirects(response, f'/assessment/{assessment_id}/question/0/', fetch_redirect_response=False)
+        response, assessment_id = self.start(mode='page')
+        self.assertRedirects(response, f'/assessment/{assessment_id}/questions/', fetch_redirect_response=False)
+
+    @override_settings(ASSESSMENT_SINGLE_PAGE=True)
+    def test_single_page_setting(self):
+        response, assessment_id = self.start()
+        self.assertRedirects(response, f'/assessment/{assessment_id}/questions/', fetch_redirect_response=False)
+        response, assessment_id = self.start(mode='step')
+        self.assertRedirects(response, f'/assessment/{assessment_id}/question/0/', fetch_redirect_response=False)
+
+
+class SubmitAssessmentTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(mobile='9000000001', password='x')
+        self.client.force_login(self.user)
+        self.questions = [
+            Question.objects.create(text=f'Q{n}', options=['A', 'B'], correct_option='A', category='aptitude')
+            for n in range(2)
+        ]
+        self.assessment = Assessment.objects.create(
+            user=self.user, question_order=[question.id for question in self.questions],
+        )
+
+    def submit(self):
+        return self.client.get(f'/assessment/{self.assessment.id}/submit/')
+
+    @override_settings(ASSESSMENT_BUFFER_ANSWERS=False)
+    def test_unbuffered_submit_skips_the_buffer(self):
+        UserResponse.objects.record(self.assessment, {question.id: 'A' for question in self.questions})
+        with mock.patch.object(answer_buffer, 'flush') as flush, \
+                mock.patch.object(answer_buffer, 'first_unanswered') as first_unanswered:
+            response = self.submit()
+        flush.assert_not_called()
+        first_unanswered.assert_not_called()
+        self.assertRedirects(response, f'/assessment/{self.assessment.id}/result/', fetch_redirect_response=False)
+        self.assessment.refresh_from_db()
+        self.assertEqual(self.assessment.status, 'completed')
+
+    @override_settings(ASSESSMENT_BUFFER_ANSWERS=True)
+    def test_buffered_submit_flushes_and_asks_missing_questions_again(self):
+        answer_buffer.add(self.assessment, self.questions[0].id, 'A')
+        response = self.submit()
+        self.assertRedirects(
+            response, f'/assessment/{self.assessment.id}/question/1/', fetch_redirect_response=False,
+        )
+        self.assertEqual(
+            dict(self.assessment.responses.values_list('question_id', 'selected_option')),
+            {self.questions[0].id: 'A'},
+        )
+
+
+class UserResponseRecordTests(TestCase):
+    def setUp(self):
+        user = CustomUser.objects.create_user(mobile='9000000001', password='x')
+        self.assessment = Assessment.objects.create(user=user)
+        self.questions = [
+            Question.objects.create(text=f'Q{n}', options=['A', 'B'], correct_option='A') for n in range(3)
+        ]
+
+    def answers(self):
+        return dict(self.assessment.responses.values_list('question_id', 'selected_option'))
+
+    def test_record_inserts_and_overwrites_in_one_statement(self):
+        first, second, third = (question.id for question in self.questions)
+        with self.assertNumQueries(1):
+            UserResponse.objects.record(self.assessment, {first: 'A', second: 'B'})
+        with self.assertNumQueries(1):
+            UserResponse.objects.record(self.assessment.id, {second: 'A', third: 'B'})
+        self.assertEqual(self.answers(), {first: 'A', second: 'A', third: 'B'})
+        self.assertEqual(self.assessment.responses.count(), 3)
+
+    def test_record_one_and_empty(self):
+        question_id = self.questions[0].id
+        UserResponse.objects.record_one(self.assessment, question_id, 'B')
+        UserResponse.objects.record_one(self.assessment, question_id, 'A')
+        with self.assertNumQueries(0):
+            self.assertEqual(UserResponse.objects.record(self.assessment, {}), [])
+        self.assertEqual(self.answers(), {question_id: 'A'})
+
+
+def reference_score(assessment):
+    """The per-response scoring submit_assessment did before the scoring engine."""
+    correct = {'technical': 0, 'aptitude': 0}
+    total = {'technical': 0, 'aptitude': 0}
+    traits = []
+    for response in assessment.responses.order_by('id'):
+        question = response.question
+        if question.category in total:
+            total[question.category] += 1
+            correct[question.category] += response.selected_option == question.correct_option
+        elif question.category == 'psychometric':
+            text = question.text.strip().rstrip('?.:')
+            mapping = next((mapped for key, mapped in PSYCH_MAPPING.items() if key in text), None)
+            if mapping and mapping.get(response.selected_option):
+                traits.append(mapping[response.selected_option])
+    if total['technical'] > 0:
+        traits += [extra for extra in ['Technical Proficiency', 'Problem Solving'] if extra not in traits]
+
+    def percent(right, count):
+        return max(int(right / count * 100), 70) if count > 0 else 0
+
+    score = percent(sum(correct.values()), sum(total.values()))
+    return score, {
+        'tech_score': percent(correct['technical'], total['technical']),
+        'tech_total': total['technical'],
+        'apt_score': percent(correct['aptitude'], total['aptitude']),
+        'apt_total': total['aptitude'],
+        'psych_profile': traits,
+        'total_score': score,
+    }
+
+
+class ScoringParityTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(mobile='9000000001', password='x')
+        self.questions = [
+            Question.objects.create(text=f'{category} {n}', options=['A', 'B', 'C'], correct_option='A', category=category)
+            for category in ('technical', 'aptitude') for n in range(5)
+        ]
+        self.questions += [
+            Question.objects.create(text=f'{text}?', options=['A', 'B', 'C'], category='psychometric')
+            for text in PSYCH_MAPPING
+        ]
+        self.questions.append(Question.objects.create(text='Unmapped?', options=['A'], category='psychometric'))
+
+    def test_engine_matches_reference(self):
+        rng = random.Random(7)
+        assessments = []
+        for _ in range(30):
+            assessment = Assessment.objects.create(user=self.user)
+            picked = rng.sample(self.questions, rng.randint(0, len(self.questions)))
+            UserResponse.objects.record(assessment, {question.id: rng.choice('ABCD') for question in picked})
+            assessments.append(assessment)
+
+        results = score_assessments([assessment.id for assessment in assessments], chunk_size=7)
+        for assessment in assessments:
+            self.assertEqual(results[assessment.id], reference_score(assessment))
+
+    def test_score_assessment_completes(self):
+        assessment = Assessment.objects.create(user=self.user)
+        UserResponse.objects.record(assessment, {self.questions[0].id: 'B', self.questions[5].id: 'A'})
+        score_assessment(assessment)
+        assessment.refresh_from_db()
+        self.assertEqual(assessment.status, 'completed')
+        # One of two right is 50%, raised to the 70% floor
+        self.assertEqual(assessment.score, 70)
+        self.assertEqual(assessment.result_data, reference_score(assessment)[1])
+
+    def completed(self, answers, days_ago, stale):
+        """A completed assessment taken ``days_ago``, stored with a wrong score if ``stale``."""
+        assessment = Assessment.objects.create(user=self.user)
+        UserResponse.objects.record(assessment, answers)
+        score, result_data = reference_score(assessment)
+        # update() so the stored values and date aren't touched by save() or signals
+        Assessment.objects.filter(id=assessment.id).update(
+            status='completed', score=score - 1 if stale else score, result_data={} if stale else result_data,
+            date_taken=timezone.now() - timedelta(days=days_ago),
+        )
+        return assessment, score, result_data
+
+    def rescore(self, *args):
+        stdout = StringIO()
+        with mock.patch.object(Assessment.objects, 'bulk_update', wraps=Assessment.objects.bulk_update) as bulk_update:
+            call_command('rescore_assessments', *args, stdout=stdout)
+        return stdout.getvalue(), [[assessment.id for assessment in call.args[0]] for call in bulk_update.call_args_list]
+
+    def stored(self, assessment):
+        assessment.refresh_from_db()
+        return assessment.score, assessment.result_data
+
+    def test_rescore_command(self):
+        technical, aptitude = self.questions[0], self.questions[5]
+        old, old_score, old_data = self.completed({technical.id: 'A'}, days_ago=30, stale=True)
+        recent, recent_score, recent_data = self.completed({technical.id: 'B', aptitude.id: 'A'}, days_ago=1, stale=True)
+        current, current_score, current_data = self.completed({aptitude.id: 'A'}, days_ago=1, stale=False)
+        UserSummary.objects.update_or_create(
+            user=self.user, defaults={'latest_assessment': recent, 'latest_score': recent_score - 1},
+        )
+
+        output, writes = self.rescore('--dry-run', '--workers', '1')
+        self.assertIn('Would change: 2', output)
+        self.assertEqual(writes, [])
+        self.assertEqual(self.stored(old), (old_score - 1, {}))
+        self.assertEqual(self.stored(recent), (recent_score - 1, {}))
+
+        since = (timezone.now() - timedelta(days=7)).strftime('%Y-%m-%d')
+        output, writes = self.rescore('--since', since, '--workers', '1')
+        self.assertIn('Processed: 2', output)
+        # Only the rows whose score or result_data moved are written
+        self.assertEqual(writes, [[recent.id]])
+        self.assertEqual(self.stored(recent), (recent_score, recent_data))
+        self.assertEqual(self.stored(current), (current_score, current_data))
+        self.assertEqual(self.stored(old), (old_score - 1, {}))
+        self.assertEqual(UserSummary.objects.get(user=self.user).latest_score, recent_score)
+
+        output, writes = self.rescore('--workers', '1')
+        self.assertEqual(writes, [[old.id]])
+        self.assertEqual(self.stored(old), (old_score, old_data))
+
+    def test_rescore_command_with_worker_processes(self):
+        rng = random.Random(11)
+        expected = {}
+        for n in range(6):
+            picked = rng.sample(self.questions, rng.randint(1, len(self.questions)))
+            assessment, score, result_data = self.completed(
+                {question.id: rng.choice('ABC') for question in picked}, days_ago=1, stale=n % 2 == 0,
+            )
+            expected[assessment.id] = (score, result_data)
+
+        output, writes = self.rescore('--workers', '2', '--chunk-size', '4')
+        self.assertIn('Changed: 3', output)
+        self.assertEqual(sorted(sum(writes, [])), sorted(list(expected)[::2]))
+        for assessment in Assessment.objects.filter(id__in=expected):
+            self.assertEqual((assessment.score, assessment.result_data), expected[assessment.id])
+
+    def test_rescore_command_rejects_a_bad_date(self):
+        with self.assertRaises(CommandError):
+            call_command('rescore_assessments', '--since', 'yesterday', stdout=StringIO())
+
+
+class QuestionBankTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.question = Question.objects.create(text='Q', options=['A'], category='aptitude')
+
+    def test_bank_reloads_after_max_age_without_a_bump(self):
+        question_id = self.question.id
+        self.assertEqual(question_bank.pick('aptitude', 5), [question_id])
+        # A write made in another process whose bump this process never sees
+        with mock.patch.object(question_bank, 'bump_version'):
+            self.question.delete()
+        self.assertEqual(question_bank.pick('aptitude', 5), [question_id])
+        with override_settings(QUESTION_BANK_MAX_AGE=0):
+            self.assertEqual(question_bank.pick('aptitude', 5), [])
@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.sites',
+    'django.contrib.postgres',
     'core',
     'users',
     'landing',
@@ -72,6 +73,9 @@ MIDDLEWARE = [
 ]
 
 AUTHENTICATION_BACKENDS = [
+    # Handles every password login (mobile or email) and stops the chain on
+    # failure; ModelBackend stays listed for sessions logged in through it.
+    'users.backends.MobileOrEmailBackend',
     'django.contrib.auth.backends.ModelBackend',
     'allauth.account.auth_backends.AuthenticationBackend',
 ]
@@ -128,13 +132,59 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default='postgres'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
-        # 'OPTIONS': {
-        #     'sslmode': 'prefer',
-        # },
-        'DISABLE_SERVER_SIDE_CURSORS': True,  # Fixes cursor naming issues
+        'OPTIONS': {
+            # 'sslmode': 'prefer',
+        },
+        # Set only behind pgbouncer in transaction mode, where server-side
+        # cursors (used by .iterator()) break
+        'DISABLE_SERVER_SIDE_CURSORS': config('DB_DISABLE_SERVER_SIDE_CURSORS', default=False, cast=bool),
+        # Ping a reused connection before handing it out (pooled or persistent)
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Connection pooling (psycopg 3 + psycopg_pool): each worker process keeps
+# DB_POOL_MIN_SIZE..DB_POOL_MAX_SIZE open connections and requests borrow one
+# instead of connecting. A request waits at most DB_POOL_TIMEOUT seconds for
+# a free connection. Size so that workers x max size stays below the
+# server's max_connections. With DB_POOL=False connections are instead kept
+# open per thread for DB_CONN_MAX_AGE seconds.
+DB_POOL = config('DB_POOL', default=True, cast=bool)
+
+if DB_POOL:
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+        'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+        'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+        'max_idle': config('DB_POOL_MAX_IDLE', default=600, cast=float),
+        'max_lifetime': config('DB_POOL_MAX_LIFETIME', default=3600, cast=float),
+    }
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=60, cast=int)
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# REDIS_URL is required in production: cache versions (core.cache), throttles
+# and buffered answers must be shared by every worker and the management
+# commands. The per-process fallback is for development; core.apps warns
+# about it when DEBUG is off.
+
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -179,6 +229,10 @@ STORAGES = {
     },
 }
 
+# Generated by `manage.py build_autocomplete_shards`; collected like any other
+# static directory so the files are fingerprinted and compressed.
+AUTOCOMPLETE_SHARDS_DIR = BASE_DIR / 'static' / 'autocomplete'
+
 CSRF_TRUSTED_ORIGINS = config('CSRF_TRUSTED_ORIGINS', default='http://localhost', cast=Csv())
 print(CSRF_TRUSTED_ORIGINS)
 
@@ -226,3 +280,69 @@ if DEBUG:
 
 
 FREE_ALL_COURSES = config('FREE_ALL_COURSES', default=False, cast=bool)
+
+# Seconds an in-process autocomplete index (core.search) is reused before it
+# is rebuilt from the database.
+SEARCH_INDEX_MAX_AGE = config('SEARCH_INDEX_MAX_AGE', default=600, cast=int)
+# Seconds before each process reloads its question bank (assessments.question_bank)
+# even if no version bump reached it.
+QUESTION_BANK_MAX_AGE = config('QUESTION_BANK_MAX_AGE', default=600, cast=int)
+# 'memory' serves autocomplete from the in-process index, 'database' from
+# pg_trgm similarity queries (icontains on SQLite).
+SEARCH_BACKEND = config('SEARCH_BACKEND', default='memory')
+# Cache-Control max-age (and server-side cache lifetime) for the JSON
+# autocomplete endpoints.
+AUTOCOMPLETE_CACHE_MAX_AGE = config('AUTOCOMPLETE_CACHE_MAX_AGE', default=300, cast=int)
+# Send "Start Assessment" to the single-page form (one POST for all answers)
+# instead of one question per page; either can still be picked with mode=.
+ASSESSMENT_SINGLE_PAGE = config('ASSESSMENT_SINGLE_PAGE', default=False, cast=bool)
+# Hold step-by-step assessment answers in the cache and write them in one
+# upsert at submit (assessments.answer_buffer). Needs a shared cache
+# (REDIS_URL) when running more than one process.
+ASSESSMENT_BUFFER_ANSWERS = config('ASSESSMENT_BUFFER_ANSWERS', default=False, cast=bool)
+# Seconds a buffered answer is kept before it has to be given again.
+ASSESSMENT_ANSWER_BUFFER_TTL = config('ASSESSMENT_ANSWER_BUFFER_TTL', default=6 * 60 * 60, cast=int)
+# One-time passwords (users.otp): lifetime in seconds, minimum seconds
+# between resends, and sends allowed per mobile number per hour.
+OTP_TTL = config('OTP_TTL', default=300, cast=int)
+OTP_RESEND_COOLDOWN = config('OTP_RESEND_COOLDOWN', default=30, cast=int)
+OTP_MAX_SENDS_PER_HOUR = config('OTP_MAX_SENDS_PER_HOUR', default=5, cast=int)
+# Phone Email lookups (users.phone_email): timeouts in seconds, pooled
+# connections per worker, retries with exponential backoff, and the circuit
+# breaker (consecutive failed lookups before failing fast, seconds open).
+# Origins (scheme://host[:port]) the callback may fetch user_json_url from;
+# add http://127.0.0.1:8765 to use run_phone_email_stub.
+PHONE_EMAIL_ALLOWED_ORIGINS = config('PHONE_EMAIL_ALLOWED_ORIGINS', default='https://user.phone.email', cast=Csv())
+PHONE_EMAIL_CONNECT_TIMEOUT = config('PHONE_EMAIL_CONNECT_TIMEOUT', default=3, cast=float)
+PHONE_EMAIL_READ_TIMEOUT = config('PHONE_EMAIL_READ_TIMEOUT', default=5, cast=float)
+PHONE_EMAIL_MAX_CONNECTIONS = config('PHONE_EMAIL_MAX_CONNECTIONS', default=50, cast=int)
+PHONE_EMAIL_RETRIES = config('PHONE_EMAIL_RETRIES', default=2, cast=int)
+PHONE_EMAIL_BACKOFF = config('PHONE_EMAIL_BACKOFF', default=0.2, cast=float)
+PHONE_EMAIL_BREAKER_THRESHOLD = config('PHONE_EMAIL_BREAKER_THRESHOLD', default=5, cast=int)
+PHONE_EMAIL_BREAKER_RESET = config('PHONE_EMAIL_BREAKER_RESET', default=30, cast=float)
+# Failed password logins (users.backends): attempts allowed per mobile/email
+# and per client IP within LOGIN_FAILURE_WINDOW seconds before further
+# attempts are refused without checking the password.
+LOGIN_MAX_FAILURES_PER_IDENTIFIER = config('LOGIN_MAX_FAILURES_PER_IDENTIFIER', default=5, cast=int)
+LOGIN_MAX_FAILURES_PER_IP = config('LOGIN_MAX_FAILURES_PER_IP', default=50, cast=int)
+LOGIN_FAILURE_WINDOW = config('LOGIN_FAILURE_WINDOW', default=15 * 60, cast=int)
+# Take the client IP for the per-IP count from the last X-Forwarded-For entry.
+# Only enable behind a proxy that appends it (nginx with proxy_params);
+# otherwise clients can set the header themselves and REMOTE_ADDR is used.
+USE_X_FORWARDED_FOR = config('USE_X_FORWARDED_FOR', default=False, cast=bool)
+# Versioned two-tier cache (core.cache): entries and seconds kept in each
+# process's LRU in front of the shared cache, seconds other callers wait
+# for the one computing a missing value (and seconds before an abandoned
+# compute lock expires), and how often each process adds its hit/miss
+# counts to the shared counters read by `cache_stats`.
+CACHE_LOCAL_MAX_ENTRIES = config('CACHE_LOCAL_MAX_ENTRIES', default=1024, cast=int)
+CACHE_LOCAL_TTL = config('CACHE_LOCAL_TTL', default=60, cast=int)
+# Seconds a process reuses namespace versions without asking the shared
+# cache, i.e. how late it may notice another process's bump_version().
+CACHE_VERSION_LOCAL_TTL = config('CACHE_VERSION_LOCAL_TTL', default=1, cast=float)
+CACHE_LOCK_WAIT = config('CACHE_LOCK_WAIT', default=2, cast=float)
+CACHE_LOCK_TIMEOUT = config('CACHE_LOCK_TIMEOUT', default=10, cast=int)
+CACHE_METRICS_FLUSH_INTERVAL = config('CACHE_METRICS_FLUSH_INTERVAL', default=60, cast=int)
+# Seconds between pool statistics log lines (core.db_pool) from each worker;
+# 0 disables them.
+DB_POOL_STATS_INTERVAL = config('DB_POOL_STATS_INTERVAL', default=300, cast=int)
@@ -1,6 +1,28 @@
+import logging
+
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db.models.signals import post_migrate
+
+logger = logging.getLogger(__name__)
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from .db_pool import log_pool_stats
+        from .search import connect_signals, create_trigram_indexes
+        connect_signals()
+        post_migrate.connect(create_trigram_indexes, sender=self)
+        request_finished.connect(log_pool_stats)
+
+        if not settings.DEBUG and settings.CACHES['default']['BACKEND'].endswith('LocMemCache'):
+            # Version bumps, throttles and buffered answers would stay inside
+            # each process; see REDIS_URL in DEPLOYMENT.md
+            logger.warning(
+                'DEBUG is off but the cache is per-process (LocMemCache): set REDIS_URL so '
+                'cache invalidation and throttles are shared by every worker'
+            )
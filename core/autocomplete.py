@@ -0,0 +1,88 @@
+"""
+Prebuilt autocomplete data served as static files.
+
+``build_autocomplete_shards`` exports the reference tables as JSON under
+``AUTOCOMPLETE_SHARDS_DIR`` (a ``static/`` subdirectory), so
+``collectstatic`` fingerprints and gzip/brotli-compresses them and the
+profile page can filter on the client. Small tables (degrees, states,
+branches) are one file each. Colleges and cities are split by the first
+``SHARD_PREFIX_LENGTHS[source]`` characters of each word of the name (two
+for colleges, whose one-character shards ran to megabytes), so a query
+only needs the shard for its first characters and still finds matches that
+start mid-name.
+"""
+import json
+import string
+
+from django.conf import settings
+from django.templatetags.static import static
+
+from .search import normalize
+
+STATIC_PREFIX = 'autocomplete'
+SHARD_CHARS = set(string.ascii_lowercase + string.digits)
+SHARD_PREFIX_LENGTHS = {'cities': 1, 'colleges': 2}
+
+
+def shard_key(text, length=1):
+    """
+    Shard of a query: its first ``length`` normalized characters, each one
+    outside ``SHARD_CHARS`` (including a space) replaced by '_'.
+    """
+    return ''.join(char if char in SHARD_CHARS else '_' for char in normalize(text)[:length])
+
+
+def word_shards(name, length=1):
+    """Shards of every query that matches ``name`` from the start of one of its words."""
+    name = normalize(name)
+    starts = [i for i, char in enumerate(name) if char != ' ' and (i == 0 or name[i - 1] == ' ')]
+    return {shard_key(name[start:], length) for start in starts}
+
+
+def shards_dir():
+    return settings.AUTOCOMPLETE_SHARDS_DIR
+
+
+# (index.json mtime, urls) of the last successful shard_urls()
+_loaded = (None, None)
+
+
+def shard_urls():
+    """
+    Fingerprinted URLs of the exported files, as written by the last
+    ``build_autocomplete_shards`` run, or None if it has not been run and
+    collected.
+
+    Shape: ``{'states': url, ..., 'colleges': {'length': 2, 'urls': {'ab': url, ...}}}``.
+
+    The result is kept until ``index.json`` changes; None is never kept, so
+    building the files doesn't need a restart to take effect.
+    """
+    global _loaded
+    try:
+        mtime = (shards_dir() / 'index.json').stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    if _loaded[0] == mtime:
+        return _loaded[1]
+
+    try:
+        with open(shards_dir() / 'index.json', encoding='utf-8') as file:
+            index = json.load(file)
+    except FileNotFoundError:
+        return None
+    urls = {}
+    try:
+        for source, files in index.items():
+            if isinstance(files, dict):
+                urls[source] = {
+                    'length': files['length'],
+                    'urls': {key: static(f'{STATIC_PREFIX}/{path}') for key, path in files['files'].items()},
+                }
+            else:
+                urls[source] = static(f'{STATIC_PREFIX}/{files}')
+    except ValueError:
+        # Built but not collected yet: the manifest has no entry for the files
+        return None
+    _loaded = (mtime, urls)
+    return urls
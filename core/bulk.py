@@ -0,0 +1,138 @@
+"""
+Helpers for the bulk import commands.
+
+``copy_from()`` streams CSV text into a table with PostgreSQL ``COPY ...
+FROM STDIN`` on either psycopg driver (psycopg2's ``copy_expert`` or
+psycopg 3's ``cursor.copy``). ``read_blocks()`` cuts a CSV file into blocks
+of whole records, so parsing can be spread over worker processes.
+``parallel_map()`` runs the parsing with a bounded number of blocks in
+flight, ``mapped_csv_rows()`` streams a file's rows out of an ``mmap`` into
+the C ``csv.reader`` line by line, and ``peak_rss_mb()`` reports memory for
+the commands' summaries.
+"""
+import csv
+import io
+import mmap
+import resource
+import sys
+from collections import deque
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
+
+
+class _ChunkReader(io.RawIOBase):
+    """File-like view over an iterator of text chunks, for psycopg2's ``copy_expert``."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        while not self._buffer:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._buffer = chunk.encode('utf-8')
+        size = min(len(target), len(self._buffer))
+        target[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def copy_from(cursor, table, columns, chunks):
+    """
+    ``COPY table (columns) FROM STDIN`` fed by ``chunks``, an iterable of
+    CSV-formatted strings. ``cursor`` is a Django cursor on PostgreSQL.
+    """
+    quote = cursor.db.ops.quote_name
+    sql = f'COPY {quote(table)} ({", ".join(quote(column) for column in columns)}) FROM STDIN WITH (FORMAT csv)'
+    if hasattr(cursor, 'copy_expert'):
+        # psycopg2
+        cursor.copy_expert(sql, io.BufferedReader(_ChunkReader(chunks), buffer_size=1 << 20))
+    else:
+        # psycopg 3
+        with cursor.copy(sql) as copy:
+            for chunk in chunks:
+                copy.write(chunk)
+
+
+def to_csv(rows):
+    """Encode ``rows`` (tuples) as CSV text accepted by ``copy_from()``."""
+    out = io.StringIO()
+    csv.writer(out, lineterminator='\n').writerows(rows)
+    return out.getvalue()
+
+
+def read_blocks(file, block_size):
+    """
+    Yield text blocks of about ``block_size`` lines from an open CSV ``file``.
+
+    A block never ends inside a quoted field, so each block parses on its own
+    with ``csv.reader(io.StringIO(block))``. Blocks are single strings because
+    they pickle to worker processes far cheaper than lists of lines.
+    """
+    block = []
+    in_quotes = False
+    for line in file:
+        block.append(line)
+        if line.count('"') % 2:
+            in_quotes = not in_quotes
+        if len(block) >= block_size and not in_quotes:
+            yield ''.join(block)
+            block = []
+    if block:
+        yield ''.join(block)
+
+
+def mapped_csv_rows(path, skip_header=True):
+    """
+    Yield the rows of the CSV at ``path`` as lists of strings, read through
+    ``mmap``.
+
+    Lines are taken off the mapping one at a time and decoded as the C
+    ``csv.reader`` asks for them, so the file is never copied into one
+    string; the OS pages it in and can drop pages already read. Rows are
+    positional, so files with repeated header names (like
+    ``city_state_jan.csv``'s two ``name`` columns) need no special handling.
+    """
+    with open(path, 'rb') as file:
+        if not file.seek(0, io.SEEK_END):
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            lines = iter(mapped.readline, b'')
+            # Only the first line can carry a byte order mark
+            first = next(lines).decode('utf-8-sig')
+            rows = csv.reader(chain([first], (line.decode('utf-8') for line in lines)))
+            if skip_header:
+                next(rows, None)
+            yield from rows
+
+
+def parallel_map(function, items, workers):
+    """
+    ``map(function, items)`` across ``workers`` processes, in order.
+
+    Unlike ``Executor.map`` it reads ``items`` lazily, keeping at most two
+    blocks per worker in flight, so memory stays flat on large files.
+    """
+    if workers <= 1:
+        yield from map(function, items)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def peak_rss_mb(children=False):
+    """Peak resident set size of this process (or of its reaped children) in MB."""
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
@@ -0,0 +1,358 @@
+"""
+Namespace version counters and a versioned two-tier cache.
+
+Anything derived from a table (in-process search snapshots, cached values
+and responses) records the version of its namespace when it is built and is
+treated as stale once the version moves. Writers call ``bump_version()``
+after changing the data, so every process sharing the cache backend sees
+the change on its next read.
+
+Values are cached with ``get_or_set()`` or the ``@cached`` decorator::
+
+    @cached('courses.coursebundle', timeout=600)
+    def active_bundles():
+        return list(CourseBundle.objects.filter(is_active=True))
+
+* Keys embed the current versions of the namespaces, so a bump invalidates
+  every entry at once without deleting anything.
+* Lookups go to a small per-process LRU first (``CACHE_LOCAL_MAX_ENTRIES``
+  entries, each kept at most ``CACHE_LOCAL_TTL`` seconds), then to the
+  shared backend (``CACHES['default']``, Redis in production). The version
+  tuple used to build the key is itself kept locally for
+  ``CACHE_VERSION_LOCAL_TTL`` seconds, so a local hit needs no round trip
+  at all; that is how long another process's ``bump_version()`` can go
+  unnoticed here (a bump in this process is seen immediately).
+* On a miss only one caller computes the value: the others wait up to
+  ``CACHE_LOCK_WAIT`` seconds for it to appear instead of all running the
+  same query against a cold key, and compute it themselves as soon as the
+  holder's lock is gone without a value (its ``compute()`` failed). The
+  lock itself expires after ``CACHE_LOCK_TIMEOUT`` seconds in case the
+  holder dies.
+* Local hits, shared hits, misses and lock waits are counted per label (the
+  function or view name) and periodically added to counters in the shared
+  backend; ``manage.py cache_stats`` reports them.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import Counter, OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+
+METRIC_EVENTS = ('local_hits', 'shared_hits', 'misses', 'lock_waits')
+
+_MISSING = object()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _version_key(namespace):
+    return f'version:{namespace}'
+
+
+def get_versions(*namespaces):
+    """Return the current versions of ``namespaces``, initializing unset ones."""
+    keys = [_version_key(namespace) for namespace in namespaces]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # Seed from the clock so a flushed cache never hands out a version
+            # that a reader already saw.
+            cache.add(key, time.time_ns(), timeout=None)
+            found[key] = cache.get(key)
+    return tuple(found[key] for key in keys)
+
+
+def get_version(namespace):
+    return get_versions(namespace)[0]
+
+
+def bump_version(*namespaces):
+    """Invalidate everything derived from ``namespaces``."""
+    _local_versions.clear()
+    for namespace in namespaces:
+        key = _version_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+def incr_counter(key, timeout):
+    """
+    Atomically increment a counter that expires ``timeout`` seconds after its
+    first increment, and return the new value (for throttles).
+    """
+    cache.add(key, 0, timeout=timeout)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.add(key, 1, timeout=timeout)
+        return 1
+
+
+class LocalCache:
+    """Thread-safe, size-bounded LRU with per-entry expiry, private to this process."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_cache = LocalCache(_setting('CACHE_LOCAL_MAX_ENTRIES', 1024))
+# namespaces -> versions, for versioned_key()
+_local_versions = LocalCache(_setting('CACHE_LOCAL_MAX_ENTRIES', 1024))
+
+
+def _cached_versions(namespaces):
+    versions = _local_versions.get(namespaces)
+    if versions is _MISSING:
+        versions = get_versions(*namespaces)
+        _local_versions.set(namespaces, versions, _setting('CACHE_VERSION_LOCAL_TTL', 1))
+    return versions
+
+
+class Metrics:
+    """Per-process hit/miss counters, added to shared counters every ``CACHE_METRICS_FLUSH_INTERVAL`` seconds."""
+
+    labels_key = 'cache_metrics:labels'
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._flushed_at = time.monotonic()
+
+    @staticmethod
+    def key(label, event):
+        return f'cache_metrics:{label}:{event}'
+
+    def record(self, label, event):
+        with self._lock:
+            self._counts[label, event] += 1
+            due = time.monotonic() - self._flushed_at >= _setting('CACHE_METRICS_FLUSH_INTERVAL', 60)
+        if due:
+            self.flush()
+
+    def snapshot(self):
+        """This process's unflushed counts as ``{label: {event: n}}``."""
+        with self._lock:
+            counts = dict(self._counts)
+        result = {}
+        for (label, event), count in counts.items():
+            result.setdefault(label, dict.fromkeys(METRIC_EVENTS, 0))[event] = count
+        return result
+
+    def flush(self):
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            self._flushed_at = time.monotonic()
+        if not counts:
+            return
+        labels = set(cache.get(self.labels_key, ()))
+        for (label, event), count in counts.items():
+            labels.add(label)
+            key = self.key(label, event)
+            cache.add(key, 0, timeout=None)
+            try:
+                cache.incr(key, count)
+            except ValueError:
+                cache.add(key, count, timeout=None)
+        cache.set(self.labels_key, sorted(labels), timeout=None)
+
+    def shared(self):
+        """Counts flushed by every process, as ``{label: {event: n}}``."""
+        labels = cache.get(self.labels_key, ())
+        keys = {self.key(label, event): (label, event) for label in labels for event in METRIC_EVENTS}
+        found = cache.get_many(keys)
+        result = {label: dict.fromkeys(METRIC_EVENTS, 0) for label in labels}
+        for key, count in found.items():
+            label, event = keys[key]
+            result[label][event] = count
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+        labels = cache.get(self.labels_key, ())
+        cache.delete_many([self.key(label, event) for label in labels for event in METRIC_EVENTS])
+        cache.delete(self.labels_key)
+
+
+metrics = Metrics()
+
+
+def versioned_key(key, namespaces=(), versions=None):
+    """
+    The cache key for ``key`` (any JSON-serializable value) at the current
+    versions of ``namespaces`` (at most ``CACHE_VERSION_LOCAL_TTL`` seconds
+    old); pass ``versions`` (from ``get_versions()``) to build many keys
+    with one lookup.
+    """
+    if versions is None:
+        versions = _cached_versions(tuple(namespaces))
+    digest = hashlib.md5(json.dumps([key, versions], default=str).encode()).hexdigest()
+    return f'cached:{digest}'
+
+
+def get_or_set(key, compute, namespaces=(), timeout=300, label=None):
+    """
+    Return the cached value of ``key`` under ``namespaces``, calling
+    ``compute()`` to produce it on a miss. ``timeout`` is the shared-cache
+    lifetime in seconds (``None`` for no expiry); ``label`` names the entry
+    in the metrics.
+    """
+    label = label or (key if isinstance(key, str) else str(key[0]))
+    return _lookup(versioned_key(key, namespaces), compute, timeout, label)
+
+
+def _lookup(full_key, compute, timeout, label):
+    local_ttl = _setting('CACHE_LOCAL_TTL', 60)
+    if timeout is not None:
+        local_ttl = min(local_ttl, timeout)
+
+    value = local_cache.get(full_key)
+    if value is not _MISSING:
+        metrics.record(label, 'local_hits')
+        return value
+
+    value = cache.get(full_key, _MISSING)
+    if value is not _MISSING:
+        metrics.record(label, 'shared_hits')
+        local_cache.set(full_key, value, local_ttl)
+        return value
+
+    metrics.record(label, 'misses')
+    lock_key = f'{full_key}:lock'
+    acquired = cache.add(lock_key, 1, timeout=_setting('CACHE_LOCK_TIMEOUT', 10))
+    if not acquired:
+        # Someone else is computing it; wait for their result
+        metrics.record(label, 'lock_waits')
+        deadline = time.monotonic() + _setting('CACHE_LOCK_WAIT', 2)
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            found = cache.get_many([full_key, lock_key])
+            if full_key in found:
+                local_cache.set(full_key, found[full_key], local_ttl)
+                return found[full_key]
+            if lock_key not in found:
+                # Released without a value: the holder's compute() failed
+                break
+        # Compute it ourselves (the holder failed, died or is too slow)
+    try:
+        value = compute()
+        cache.set(full_key, value, timeout=timeout)
+    finally:
+        if acquired:
+            cache.delete(lock_key)
+    local_cache.set(full_key, value, local_ttl)
+    return value
+
+
+def cached(*namespaces, timeout=300, key=None):
+    """
+    Cache a function's return value per arguments with ``get_or_set()``.
+
+    ``namespaces`` are the data the value is derived from; bumping any of
+    them invalidates it. ``key``, if given, maps the call's arguments to the
+    part of the key that varies (by default all of them, which must then be
+    JSON-serializable or have a stable ``str()``).
+    """
+    def decorator(function):
+        label = f'{function.__module__}.{function.__qualname__}'
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            parts = key(*args, **kwargs) if key else [args, sorted(kwargs.items())]
+            return get_or_set(
+                [label, parts], lambda: function(*args, **kwargs),
+                namespaces=namespaces, timeout=timeout, label=label,
+            )
+        return wrapper
+    return decorator
+
+
+class _Uncacheable(Exception):
+    """Raised out of a ``compute()`` to skip caching (non-200 responses)."""
+
+
+def cached_json_view(*namespaces, params=('q',)):
+    """
+    Cache a read-only JSON view per ``(view, params, namespace versions)``.
+
+    The response carries an ETag derived from the same key plus a public
+    ``Cache-Control: max-age`` so browsers and nginx can reuse it; a
+    matching ``If-None-Match`` is answered with 304 before the cache is
+    read. Parameter values are case- and whitespace-normalized, which suits
+    the case-insensitive search endpoints this is meant for.
+    """
+    def decorator(view):
+        view_name = f'{view.__module__}.{view.__name__}'
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+
+            max_age = getattr(settings, 'AUTOCOMPLETE_CACHE_MAX_AGE', 300)
+            values = [' '.join(request.GET.get(param, '').lower().split()) for param in params]
+            full_key = versioned_key([view_name, values], namespaces)
+            etag = f'"{full_key.split(":", 1)[1]}"'
+
+            if etag in parse_etags(request.headers.get('If-None-Match', '')):
+                response = HttpResponseNotModified()
+            else:
+                failed = []
+
+                def render():
+                    response = view(request, *args, **kwargs)
+                    if response.status_code != 200:
+                        failed.append(response)
+                        raise _Uncacheable
+                    return response.content
+
+                try:
+                    content = _lookup(full_key, render, max_age, view_name)
+                except _Uncacheable:
+                    return failed[0]
+                response = HttpResponse(content, content_type='application/json')
+
+            response['ETag'] = etag
+            patch_cache_control(response, public=True, max_age=max_age)
+            return response
+        return wrapper
+    return decorator
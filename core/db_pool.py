@@ -0,0 +1,75 @@
+"""
+Statistics for the psycopg connection pool (``DATABASES['default']['OPTIONS']['pool']``).
+
+Each worker process has its own pool. ``log_pool_stats`` — connected to
+``request_finished`` — logs what the pool did since its last line every
+``DB_POOL_STATS_INTERVAL`` seconds: requests served, how long they waited
+for a connection on average, and how many timed out. It reads the counters
+with ``pop_stats()``, which resets them, so ``pool_stats()`` only counts
+what happened since that last line. ``benchmark_db_connections`` builds
+pools of its own and is not affected. The line is a warning when the average wait exceeds
+``SLOW_WAIT_MS``, which means the pool is too small for the load.
+"""
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+SLOW_WAIT_MS = 50
+
+_lock = threading.Lock()
+_logged_at = time.monotonic()
+
+
+def get_pool(alias='default'):
+    """The alias's ``psycopg_pool.ConnectionPool``, or None when pooling is off."""
+    return getattr(connections[alias], 'pool', None)
+
+
+def pool_stats(alias='default'):
+    """
+    The pool's ``get_stats()`` without resetting anything, or None when pooling
+    is off. The request counters cover only the time since ``log_pool_stats``
+    last reset them (pool size and availability are current values).
+    """
+    pool = get_pool(alias)
+    return pool.get_stats() if pool is not None else None
+
+
+def summarize(stats):
+    """One line from a ``get_stats()``/``pop_stats()`` dict."""
+    requests = stats.get('requests_num', 0)
+    waited = stats.get('requests_wait_ms', 0)
+    return (
+        f'requests={requests} avg_wait_ms={waited / requests if requests else 0:.1f} '
+        f'queued={stats.get("requests_queued", 0)} timeouts={stats.get("requests_errors", 0)} '
+        f'size={stats.get("pool_size", 0)}/{stats.get("pool_max", 0)} available={stats.get("pool_available", 0)} '
+        f'connect_errors={stats.get("connections_errors", 0)} lost={stats.get("connections_lost", 0)}'
+    )
+
+
+def log_pool_stats(sender=None, **kwargs):
+    """``request_finished`` receiver: log this process's pool counters once per interval."""
+    global _logged_at
+    interval = getattr(settings, 'DB_POOL_STATS_INTERVAL', 300)
+    if not interval or time.monotonic() - _logged_at < interval:
+        return
+    pool = get_pool()
+    if pool is None:
+        return
+    with _lock:
+        if time.monotonic() - _logged_at < interval:
+            return
+        _logged_at = time.monotonic()
+        # pop_stats() resets the counters, so each line covers one interval
+        stats = pool.pop_stats()
+
+    requests = stats.get('requests_num', 0)
+    slow = requests and stats.get('requests_wait_ms', 0) / requests > SLOW_WAIT_MS
+    log = logger.warning if slow or stats.get('requests_errors') else logger.info
+    log('DB pool (pid %s, last %ss): %s', os.getpid(), interval, summarize(stats))
@@ -0,0 +1,98 @@
+import copy
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from core.db_pool import summarize
+
+
+class Command(BaseCommand):
+    help = 'Load-test per-request connections against the connection pool (PostgreSQL only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Simulated requests per run (default: 2000)')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent worker threads (default: 8)')
+        parser.add_argument(
+            '--pool-size',
+            type=int,
+            default=0,
+            help='max_size of the benchmark pool (default: the concurrency)'
+        )
+        parser.add_argument(
+            '--query',
+            type=str,
+            default='SELECT 1',
+            help='SQL each simulated request runs (default: SELECT 1)'
+        )
+
+    def handle(self, *args, **options):
+        base = connections['default']
+        if base.vendor != 'postgresql':
+            raise CommandError('Connection pooling is only configured for PostgreSQL')
+
+        self.stdout.write(
+            f'{options["requests"]:,} requests x "{options["query"]}" '
+            f'with {options["concurrency"]} concurrent workers'
+        )
+        pool_size = options['pool_size'] or options['concurrency']
+        runs = [
+            ('Connect per request', 'bench_direct', None),
+            (f'Pooled (max_size={pool_size})', 'bench_pool', {'min_size': pool_size, 'max_size': pool_size}),
+        ]
+        for label, alias, pool in runs:
+            self.run(label, self.wrapper_factory(base, alias, pool), options)
+
+    @staticmethod
+    def wrapper_factory(base, alias, pool):
+        """A callable making per-thread connections like ``default`` but with or without a pool."""
+        settings_dict = copy.deepcopy(base.settings_dict)
+        settings_dict['CONN_MAX_AGE'] = 0
+        settings_dict['OPTIONS'].pop('pool', None)
+        if pool:
+            settings_dict['OPTIONS']['pool'] = pool
+        return lambda: base.__class__(settings_dict, alias)
+
+    def run(self, label, make_wrapper, options):
+        local = threading.local()
+        connect_ms = []
+        total_ms = []
+
+        def request(_):
+            wrapper = getattr(local, 'wrapper', None)
+            if wrapper is None:
+                wrapper = local.wrapper = make_wrapper()
+            begin = time.perf_counter()
+            wrapper.ensure_connection()
+            connected = time.perf_counter()
+            with wrapper.cursor() as cursor:
+                cursor.execute(options['query'])
+                cursor.fetchall()
+            # Returns the connection to the pool, or closes it like CONN_MAX_AGE=0
+            wrapper.close()
+            connect_ms.append((connected - begin) * 1000)
+            total_ms.append((time.perf_counter() - begin) * 1000)
+
+        probe = make_wrapper()
+        if probe.pool is not None:
+            # Open and fill the pool first, as a running worker's would be
+            probe.pool.open(wait=True)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            list(executor.map(request, range(options['requests'])))
+        elapsed = time.perf_counter() - start
+
+        connect_ms.sort()
+        total_ms.sort()
+        p95 = int(len(total_ms) * 0.95)
+        self.stdout.write(self.style.SUCCESS(
+            f'{label}\n'
+            f'  Requests/sec: {len(total_ms) / elapsed:,.0f}\n'
+            f'  Connection acquire p50/p95: {statistics.median(connect_ms):.2f} / {connect_ms[p95]:.2f} ms\n'
+            f'  Request p50/p95: {statistics.median(total_ms):.2f} / {total_ms[p95]:.2f} ms'
+        ))
+        if probe.pool is not None:
+            self.stdout.write(f'  Pool: {summarize(probe.pool.get_stats())}')
+            probe.close_pool()
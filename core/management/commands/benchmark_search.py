@@ -0,0 +1,101 @@
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from core.models import College
+from core.search import DatabaseIndex, SearchIndex
+
+# Word pool used to generate synthetic college names for --seed
+WORDS = [
+    'Indian', 'Institute', 'Technology', 'Engineering', 'College', 'University',
+    'Government', 'National', 'Arts', 'Science', 'Commerce', 'Management',
+    'Medical', 'Pharmacy', 'Polytechnic', 'Women', 'Delhi', 'Mumbai', 'Chennai',
+    'Kolkata', 'Bangalore', 'Hyderabad', 'Pune', 'Jaipur', 'Lucknow', 'Madras',
+    'Saint', 'Xavier', 'Sri', 'Venkateswara', 'Dayanand', 'Anglo', 'Vedic',
+    'Rajiv', 'Gandhi', 'Nehru', 'Memorial', 'Trust', 'Society', 'Academy',
+]
+
+
+class Command(BaseCommand):
+    help = 'Compare p50/p99 latency of college autocomplete: icontains vs pg_trgm vs in-memory index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Insert synthetic colleges until the table holds this many rows (e.g. 1000000)'
+        )
+        parser.add_argument(
+            '--queries',
+            type=int,
+            default=500,
+            help='Number of autocomplete queries per backend (default: 500)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Rows per insert batch when seeding (default: 10000)'
+        )
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options['seed'], options['batch_size'])
+
+        total = College.objects.count()
+        self.stdout.write(f'Benchmarking against {total:,} colleges on {connection.vendor}')
+        queries = self.sample_queries(options['queries'])
+
+        backends = [
+            ('icontains', self.icontains),
+            ('database', DatabaseIndex(College).search),
+        ]
+        memory = SearchIndex(College)
+        start = time.perf_counter()
+        memory.snapshot()
+        self.stdout.write(f'In-memory index built in {time.perf_counter() - start:.2f}s')
+        backends.append(('memory', memory.search))
+
+        for label, search in backends:
+            timings = []
+            for query in queries:
+                start = time.perf_counter()
+                search(query)
+                timings.append((time.perf_counter() - start) * 1000)
+            percentiles = statistics.quantiles(timings, n=100)
+            self.stdout.write(
+                f'  {label:<10} p50={percentiles[49]:8.3f}ms  p99={percentiles[98]:8.3f}ms'
+            )
+
+    def icontains(self, query):
+        """The lookup core.views.search_colleges used before the search backends."""
+        return list(College.objects.filter(name__icontains=query).values('id', 'name')[:10])
+
+    def sample_queries(self, count):
+        """Keystroke-like queries: prefixes and mid-name fragments of real names."""
+        names = list(College.objects.order_by('?').values_list('name', flat=True)[:count])
+        if not names:
+            return ['a'] * count
+        queries = []
+        for i in range(count):
+            name = names[i % len(names)].lower()
+            length = random.randint(1, 8)
+            offset = 0 if i % 2 else random.randint(0, max(len(name) - length, 0))
+            queries.append(name[offset:offset + length])
+        return queries
+
+    def seed(self, target, batch_size):
+        existing = College.objects.count()
+        self.stdout.write(f'Seeding {max(target - existing, 0):,} synthetic colleges...')
+        for start in range(existing, target, batch_size):
+            batch = [
+                College(name=f"{' '.join(random.sample(WORDS, 4))} {n}", short_name='')
+                for n in range(start, min(start + batch_size, target))
+            ]
+            with transaction.atomic():
+                College.objects.bulk_create(batch)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE core_college')
@@ -0,0 +1,80 @@
+import json
+import shutil
+from collections import defaultdict
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from core.autocomplete import SHARD_PREFIX_LENGTHS, shards_dir, word_shards
+from core.models import Branch, City, CityState, College, Degree, State
+from core.search import normalize
+
+
+class Command(BaseCommand):
+    help = 'Export reference tables as static JSON files for client-side autocomplete'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--collect',
+            action='store_true',
+            help='Run collectstatic afterwards so the files are fingerprinted and compressed'
+        )
+
+    def handle(self, *args, **options):
+        output_dir = shards_dir()
+        if output_dir.exists():
+            shutil.rmtree(output_dir)
+        output_dir.mkdir(parents=True)
+
+        index = {}
+        index['states'] = self.write(output_dir, 'states.json', self.rows(State.objects.values_list('id', 'name')))
+        index['branches'] = self.write(output_dir, 'branches.json', self.rows(Branch.objects.values_list('id', 'name')))
+        index['degrees'] = self.write(output_dir, 'degrees.json', self.rows(
+            (pk, f'{name} - {full_name}')
+            for pk, name, full_name in Degree.objects.values_list('id', 'name', 'full_name')
+        ))
+
+        # Cities carry their state ids so the dependent dropdown filters locally
+        states_by_city = defaultdict(list)
+        for city_id, state_id in CityState.objects.values_list('city_id', 'state_id').iterator(chunk_size=10000):
+            states_by_city[city_id].append(state_id)
+        cities = (
+            (pk, name, states_by_city.get(pk, []))
+            for pk, name in City.objects.values_list('id', 'name').iterator(chunk_size=10000)
+        )
+        index['cities'] = self.write_sharded(output_dir, 'cities', cities)
+
+        colleges = College.objects.values_list('id', 'name').iterator(chunk_size=10000)
+        index['colleges'] = self.write_sharded(output_dir, 'colleges', colleges)
+
+        with open(output_dir / 'index.json', 'w', encoding='utf-8') as file:
+            json.dump(index, file)
+
+        self.stdout.write(self.style.SUCCESS(f'Autocomplete files written to {output_dir}'))
+
+        if options['collect']:
+            call_command('collectstatic', interactive=False, verbosity=0)
+            self.stdout.write(self.style.SUCCESS('Collected static files'))
+
+    def rows(self, rows):
+        """Rows with a name, sorted the way the client ranks them."""
+        return sorted((list(row) for row in rows if row[1]), key=lambda row: normalize(row[1]))
+
+    def write_sharded(self, output_dir, source, rows):
+        length = SHARD_PREFIX_LENGTHS[source]
+        shards = defaultdict(list)
+        for row in rows:
+            if not row[1]:
+                continue
+            for key in word_shards(row[1], length):
+                shards[key].append(list(row))
+
+        (output_dir / source).mkdir()
+        files = {}
+        for key, shard_rows in shards.items():
+            files[key] = self.write(output_dir, f'{source}/{key}.json', self.rows(shard_rows))
+        self.stdout.write(f'  {source}: {len(files)} shards')
+        return {'length': length, 'files': files}
+
+    def write(self, output_dir, path, rows):
+        with open(output_dir / path, 'w', encoding='utf-8') as file:
+            json.dump(rows, file, separators=(',', ':'), ensure_ascii=False)
+        return path
@@ -1,12 +1,18 @@
-import csv
 import logging
+import statistics
+import time
 from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.db import connection, transaction
+from core.bulk import copy_from, mapped_csv_rows, to_csv
+from core.cache import bump_version
 from core.models import City, State, CityState
+from core.search import signals_disconnected
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+NAMESPACES = ('core.city', 'core.state', 'core.citystate')
+
 
 class Command(BaseCommand):
     help = 'Bulk import cities, states, and their mappings from CSV with logging'
@@ -15,8 +21,8 @@ class Command(BaseCommand):
         parser.add_argument(
             '--batch-size',
             type=int,
-            default=1000,
-            help='Number of records to insert per batch (default: 1000)'
+            default=10000,
+            help='Number of records to insert per batch (default: 10000)'
         )
         parser.add_argument(
             '--file',
@@ -34,6 +40,13 @@ class Command(BaseCommand):
             action='store_true',
             help='Enable verbose logging'
         )
+        parser.add_argument(
+            '--benchmark',
+            type=int,
+            default=0,
+            metavar='RUNS',
+            help='Time RUNS full imports into emptied tables, each rolled back, and report them'
+        )
 
     def handle(self, *args, **options):
         csv_file = options['file']
@@ -47,151 +60,33 @@ class Command(BaseCommand):
         else:
             logging.basicConfig(level=logging.INFO)
 
+        if options['benchmark']:
+            return self.benchmark(csv_file, batch_size, options['benchmark'])
+
         self.log_info(f'Starting bulk import from {csv_file}')
         self.log_info(f'Batch size: {batch_size}')
 
         if clear_existing:
             self.log_info('Clearing existing data...')
-            CityState.objects.all().delete()
-            City.objects.all().delete()
-            State.objects.all().delete()
+            with signals_disconnected(*NAMESPACES):
+                self.clear()
             self.log_info('Existing data cleared')
 
         try:
-            # Phase 1: Collect unique states and cities
-            self.log_info('Phase 1: Reading CSV and collecting unique entries...')
-            
-            unique_states = {}  # name -> State object
-            unique_cities = {}  # name -> City object
-            city_state_pairs = []  # [(city_name, state_name), ...]
-            
-            total_rows = 0
-            
-            with open(csv_file, 'r', encoding='utf-8') as file:
-                # Read header to understand structure
-                header = file.readline().strip()
-                self.log_info(f'CSV Header: {header}')
-                
-                # Handle CSV with duplicate 'name' columns
-                # Expected format: city_id, name (city), state_id, name (state)
-                # We'll read raw and parse by position
-                
-                for line in file:
-                    total_rows += 1
-                    
-                    # Parse CSV line (handle quoted values)
-                    parts = []
-                    current = ''
-                    in_quotes = False
-                    for char in line.strip():
-                        if char == '"':
-                            in_quotes = not in_quotes
-                        elif char == ',' and not in_quotes:
-                            parts.append(current.strip().strip('"'))
-                            current = ''
-                        else:
-                            current += char
-                    parts.append(current.strip().strip('"'))
-                    
-                    if len(parts) >= 4:
-                        # city_id, city_name, state_id, state_name
-                        city_name = parts[1].strip()
-                        state_name = parts[3].strip()
-                        
-                        if city_name and state_name:
-                            unique_states[state_name] = None
-                            unique_cities[city_name] = None
-                            city_state_pairs.append((city_name, state_name))
-                    
-                    if total_rows % 10000 == 0:
-                        self.log_info(f'  Read {total_rows:,} rows...')
-
-            self.log_info(f'Total rows read: {total_rows:,}')
-            self.log_info(f'Unique states: {len(unique_states):,}')
-            self.log_info(f'Unique cities: {len(unique_cities):,}')
-            self.log_info(f'City-State pairs: {len(city_state_pairs):,}')
-
-            # Phase 2: Bulk create states
-            self.log_info('Phase 2: Creating states...')
-            existing_states = {s.name: s for s in State.objects.all()}
-            
-            states_to_create = []
-            for state_name in unique_states.keys():
-                if state_name not in existing_states:
-                    states_to_create.append(State(name=state_name))
-            
-            if states_to_create:
-                created_states = self._bulk_create_in_batches(
-                    State, states_to_create, batch_size, 'states'
-                )
-                # Refresh existing_states dict
-                for state in State.objects.filter(name__in=[s.name for s in states_to_create]):
-                    existing_states[state.name] = state
-            
-            states_created = len(states_to_create)
-            self.log_info(f'States created: {states_created:,}')
-
-            # Phase 3: Bulk create cities
-            self.log_info('Phase 3: Creating cities...')
-            existing_cities = {c.name: c for c in City.objects.all()}
-            
-            cities_to_create = []
-            for city_name in unique_cities.keys():
-                if city_name not in existing_cities:
-                    cities_to_create.append(City(name=city_name))
-            
-            if cities_to_create:
-                self._bulk_create_in_batches(
-                    City, cities_to_create, batch_size, 'cities'
-                )
-                # Refresh existing_cities dict
-                for city in City.objects.filter(name__in=[c.name for c in cities_to_create]):
-                    existing_cities[city.name] = city
-            
-            cities_created = len(cities_to_create)
-            self.log_info(f'Cities created: {cities_created:,}')
-
-            # Phase 4: Bulk create city-state mappings
-            self.log_info('Phase 4: Creating city-state mappings...')
-            
-            # Get all existing mappings
-            existing_mappings = set(
-                CityState.objects.values_list('city__name', 'state__name')
-            )
-            
-            mappings_to_create = []
-            skipped_mappings = 0
-            
-            for city_name, state_name in city_state_pairs:
-                if (city_name, state_name) in existing_mappings:
-                    skipped_mappings += 1
-                    continue
-                
-                city = existing_cities.get(city_name)
-                state = existing_states.get(state_name)
-                
-                if city and state:
-                    mappings_to_create.append(
-                        CityState(city=city, state=state)
-                    )
-                    existing_mappings.add((city_name, state_name))
-            
-            if mappings_to_create:
-                self._bulk_create_in_batches(
-                    CityState, mappings_to_create, batch_size, 'city-state mappings',
-                    ignore_conflicts=True
-                )
-            
-            mappings_created = len(mappings_to_create)
-            
+            stats = self.import_file(csv_file, batch_size)
+
+            # bulk_create/COPY skip signals, so rebuild the city/state search indexes explicitly
+            bump_version(*NAMESPACES)
+
             self.log_info('')
             self.stdout.write(self.style.SUCCESS(
                 f'Import complete!\n'
-                f'  Total rows processed: {total_rows:,}\n'
-                f'  States created: {states_created:,}\n'
-                f'  Cities created: {cities_created:,}\n'
-                f'  Mappings created: {mappings_created:,}\n'
-                f'  Mappings skipped (duplicates): {skipped_mappings:,}'
+                f'  Total rows processed: {stats["rows"]:,}\n'
+                f'  States created: {stats["states"]:,}\n'
+                f'  Cities created: {stats["cities"]:,}\n'
+                f'  Mappings created: {stats["mappings"]:,}\n'
+                f'  Mappings skipped (duplicates): {stats["skipped"]:,}\n'
+                f'  Elapsed: {stats["elapsed"]:.3f}s'
             ))
 
         except FileNotFoundError:
@@ -202,18 +97,134 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f'Error: {str(e)}'))
             raise
 
+    def clear(self):
+        CityState.objects.all().delete()
+        City.objects.all().delete()
+        State.objects.all().delete()
+
+    def import_file(self, csv_file, batch_size):
+        """
+        Import ``csv_file`` (``city_id, name, state_id, name``) and return counts
+        and timings. Names are resolved to ids with dicts; the database is
+        only touched for whole-table reads and bulk inserts.
+        """
+        start = time.perf_counter()
+        phase_start = start
+
+        def phase_done(label):
+            nonlocal phase_start
+            now = time.perf_counter()
+            self.log_info(f'  {label} in {now - phase_start:.3f}s')
+            phase_start = now
+
+        # Phase 1: Collect unique states, cities and pairs (positional columns)
+        self.log_info('Phase 1: Reading CSV and collecting unique entries...')
+        unique_states = {}
+        unique_cities = {}
+        pairs = {}
+        total_rows = 0
+        valid_rows = 0
+        for row in mapped_csv_rows(csv_file):
+            total_rows += 1
+            if len(row) < 4:
+                continue
+            city_name = row[1].strip()
+            state_name = row[3].strip()
+            if city_name and state_name:
+                valid_rows += 1
+                unique_states[state_name] = None
+                unique_cities[city_name] = None
+                pairs[city_name, state_name] = None
+        self.log_info(f'Total rows read: {total_rows:,}')
+        self.log_info(f'Unique states: {len(unique_states):,}')
+        self.log_info(f'Unique cities: {len(unique_cities):,}')
+        self.log_info(f'City-State pairs: {len(pairs):,}')
+        phase_done('Read')
+
+        # Phase 2/3: Create missing states and cities, then map names to ids
+        self.log_info('Phase 2: Creating states...')
+        state_ids, states_created = self._create_missing(State, unique_states, batch_size, 'states')
+        self.log_info(f'States created: {states_created:,}')
+        phase_done('States')
+
+        self.log_info('Phase 3: Creating cities...')
+        city_ids, cities_created = self._create_missing(City, unique_cities, batch_size, 'cities')
+        self.log_info(f'Cities created: {cities_created:,}')
+        phase_done('Cities')
+
+        # Phase 4: Insert the city-state mappings that don't exist yet
+        self.log_info('Phase 4: Creating city-state mappings...')
+        existing_mappings = set(CityState.objects.values_list('city_id', 'state_id'))
+        new_mappings = []
+        for city_name, state_name in pairs:
+            key = (city_ids[city_name], state_ids[state_name])
+            if key not in existing_mappings:
+                new_mappings.append(key)
+                existing_mappings.add(key)
+        skipped_mappings = valid_rows - len(new_mappings)
+
+        self._insert(CityState, ['city_id', 'state_id'], new_mappings, batch_size, 'city-state mappings')
+        phase_done('Mappings')
+
+        return {
+            'rows': total_rows,
+            'states': states_created,
+            'cities': cities_created,
+            'mappings': len(new_mappings),
+            'skipped': skipped_mappings,
+            'elapsed': time.perf_counter() - start,
+        }
+
+    def _create_missing(self, model, names, batch_size, label):
+        """Insert ``names`` not yet in ``model``; return ``({name: id}, created)``."""
+        ids = dict(model.objects.values_list('name', 'id'))
+        missing = [(name,) for name in names if name not in ids]
+        if missing:
+            self._insert(model, ['name'], missing, batch_size, label)
+            ids = dict(model.objects.values_list('name', 'id'))
+        return ids, len(missing)
+
+    def _insert(self, model, columns, rows, batch_size, label):
+        """Insert ``rows`` (tuples of ``columns``): COPY on PostgreSQL, else bulk_create batches."""
+        if not rows:
+            return
+        if connection.vendor == 'postgresql':
+            with transaction.atomic(), connection.cursor() as cursor:
+                copy_from(cursor, model._meta.db_table, columns, [to_csv(rows)])
+            self.log_debug(f'  Copied {len(rows):,} {label}')
+        else:
+            objects = [model(**dict(zip(columns, row))) for row in rows]
+            self._bulk_create_in_batches(model, objects, batch_size, label)
+
+    def benchmark(self, csv_file, batch_size, runs):
+        """Import into emptied tables ``runs`` times, rolling each run back."""
+        timings = []
+        for run in range(1, runs + 1):
+            with transaction.atomic(), signals_disconnected():
+                self.clear()
+                timings.append(self.import_file(csv_file, batch_size)['elapsed'])
+                transaction.set_rollback(True)
+            self.stdout.write(f'Run {run}: {timings[-1]:.3f}s')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Benchmark complete!\n'
+            f'  Runs: {runs}\n'
+            f'  Best: {min(timings):.3f}s\n'
+            f'  Median: {statistics.median(timings):.3f}s'
+        ))
+
     def _bulk_create_in_batches(self, model, objects, batch_size, label, ignore_conflicts=False):
         """Helper to bulk create objects in batches with progress logging"""
         total = len(objects)
         created = 0
-        
+
         for i in range(0, total, batch_size):
             batch = objects[i:i + batch_size]
             with transaction.atomic():
                 model.objects.bulk_create(batch, ignore_conflicts=ignore_conflicts)
             created += len(batch)
             self.log_debug(f'  Created {created:,}/{total:,} {label}')
-        
+
         return created
 
     def log_info(self, message):
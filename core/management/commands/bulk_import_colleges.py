@@ -1,7 +1,35 @@
 import csv
+import io
+import os
+import time
+from functools import partial
 from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.db import connection, transaction
+from core.bulk import copy_from, parallel_map, peak_rss_mb, read_blocks, to_csv
+from core.cache import bump_version
 from core.models import College
+from core.search import signals_disconnected
+
+
+def parse_block(block, name_index, short_name_index):
+    """
+    Parse and normalize one block of CSV text (runs in a worker process).
+
+    Returns ``(csv_text, rows_read, rows_kept)``; rows without a name and
+    names repeated inside the block are dropped.
+    """
+    seen = set()
+    rows = []
+    read = 0
+    for record in csv.reader(io.StringIO(block)):
+        read += 1
+        name = record[name_index].strip() if len(record) > name_index else ''
+        if not name or name in seen:
+            continue
+        seen.add(name)
+        short_name = record[short_name_index].strip() if 0 <= short_name_index < len(record) else ''
+        rows.append((name, short_name))
+    return to_csv(rows), read, len(rows)
 
 
 class Command(BaseCommand):
@@ -25,6 +53,18 @@ class Command(BaseCommand):
             action='store_true',
             help='Clear existing colleges before import'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Parse processes for the PostgreSQL COPY path; 1 parses in this process (default: CPU count)'
+        )
+        parser.add_argument(
+            '--block-size',
+            type=int,
+            default=50000,
+            help='CSV lines handed to a parse worker at a time (default: 50000)'
+        )
 
     def handle(self, *args, **options):
         csv_file = options['file']
@@ -32,75 +72,138 @@ class Command(BaseCommand):
         clear_existing = options['clear']
 
         self.stdout.write(f'Starting bulk import from {csv_file}...')
-        self.stdout.write(f'Batch size: {batch_size}')
 
         if clear_existing:
             self.stdout.write('Clearing existing colleges...')
-            College.objects.all().delete()
+            with signals_disconnected('core.college'):
+                College.objects.all().delete()
 
+        start = time.perf_counter()
         try:
-            # First pass: Get existing colleges to avoid duplicates
-            existing_names = set(College.objects.values_list('name', flat=True))
-            self.stdout.write(f'Found {len(existing_names)} existing colleges')
-
-            # Read CSV and prepare batches
-            colleges_to_create = []
-            total_processed = 0
-            total_created = 0
-            skipped = 0
-
-            with open(csv_file, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                
-                for row in reader:
-                    total_processed += 1
-                    name = row.get('name', '').strip()
-                    short_name = row.get('short_name', '').strip()
-
-                    if not name:
-                        skipped += 1
-                        continue
-
-                    # Skip if already exists
-                    if name in existing_names:
-                        skipped += 1
-                        continue
-
-                    colleges_to_create.append(
-                        College(name=name, short_name=short_name or '')
-                    )
-                    existing_names.add(name)  # Track to avoid duplicates in same batch
-
-                    # Bulk insert when batch is full
-                    if len(colleges_to_create) >= batch_size:
-                        with transaction.atomic():
-                            College.objects.bulk_create(
-                                colleges_to_create,
-                                ignore_conflicts=True
-                            )
-                        total_created += len(colleges_to_create)
-                        self.stdout.write(
-                            f'  Processed {total_processed:,} rows, created {total_created:,} colleges...'
-                        )
-                        colleges_to_create = []
-
-                # Insert remaining records
-                if colleges_to_create:
-                    with transaction.atomic():
-                        College.objects.bulk_create(
-                            colleges_to_create,
-                            ignore_conflicts=True
-                        )
-                    total_created += len(colleges_to_create)
-
+            if connection.vendor == 'postgresql':
+                total_processed, total_created, skipped = self.import_copy(
+                    csv_file, options['workers'], options['block_size']
+                )
+            else:
+                self.stdout.write(f'Batch size: {batch_size}')
+                total_processed, total_created, skipped = self.import_orm(csv_file, batch_size)
+
+            # Bulk writes skip signals, so invalidate the search index and cached responses
+            bump_version('core.college')
+
+            elapsed = time.perf_counter() - start
+            rate = total_processed / elapsed if elapsed else 0
             self.stdout.write(self.style.SUCCESS(
                 f'\nImport complete!'
                 f'\n  Total rows processed: {total_processed:,}'
                 f'\n  Colleges created: {total_created:,}'
                 f'\n  Skipped (duplicates/empty): {skipped:,}'
+                f'\n  Elapsed: {elapsed:.2f}s ({rate:,.0f} rows/sec)'
+                f'\n  Peak RSS: {peak_rss_mb():,.0f} MB'
             ))
+            if connection.vendor == 'postgresql' and options['workers'] > 1:
+                self.stdout.write(f'  Peak RSS of a parse worker: {peak_rss_mb(children=True):,.0f} MB')
 
         except FileNotFoundError:
             self.stdout.write(self.style.ERROR(f'File not found: {csv_file}'))
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'Error: {str(e)}'))
+
+    def import_copy(self, csv_file, workers, block_size):
+        """
+        PostgreSQL: parse blocks in worker processes, stream them through
+        COPY into a temporary staging table, then insert the new names in
+        one statement, letting the unique constraint on name drop existing
+        ones.
+        """
+        self.stdout.write(f'Using COPY with {workers} parse worker(s)')
+        table = connection.ops.quote_name(College._meta.db_table)
+        counts = {'read': 0}
+
+        with open(csv_file, 'r', encoding='utf-8', newline='') as file:
+            header = next(csv.reader([file.readline()]))
+            parse = partial(
+                parse_block,
+                name_index=header.index('name'),
+                short_name_index=header.index('short_name') if 'short_name' in header else -1,
+            )
+            parsed = parallel_map(parse, read_blocks(file, block_size), workers)
+
+            def chunks():
+                for text, read, _ in parsed:
+                    counts['read'] += read
+                    yield text
+                    self.stdout.write(f'  Streamed {counts["read"]:,} rows...')
+
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    'CREATE TEMPORARY TABLE college_staging '
+                    '(name varchar(500), short_name varchar(255)) ON COMMIT DROP'
+                )
+                copy_from(cursor, 'college_staging', ['name', 'short_name'], chunks())
+                cursor.execute(
+                    f'INSERT INTO {table} (name, short_name) '
+                    f'SELECT name, short_name FROM college_staging '
+                    f'ON CONFLICT (name) DO NOTHING'
+                )
+                created = cursor.rowcount
+
+        return counts['read'], created, counts['read'] - created
+
+    def import_orm(self, csv_file, batch_size):
+        """Other databases (SQLite in development): batched bulk_create."""
+        # First pass: Get existing colleges to avoid duplicates
+        existing_names = set(College.objects.values_list('name', flat=True))
+        self.stdout.write(f'Found {len(existing_names)} existing colleges')
+
+        # Read CSV and prepare batches
+        colleges_to_create = []
+        total_processed = 0
+        total_created = 0
+        skipped = 0
+
+        with open(csv_file, 'r', encoding='utf-8') as file:
+            reader = csv.DictReader(file)
+
+            for row in reader:
+                total_processed += 1
+                name = row.get('name', '').strip()
+                short_name = row.get('short_name', '').strip()
+
+                if not name:
+                    skipped += 1
+                    continue
+
+                # Skip if already exists
+                if name in existing_names:
+                    skipped += 1
+                    continue
+
+                colleges_to_create.append(
+                    College(name=name, short_name=short_name or '')
+                )
+                existing_names.add(name)  # Track to avoid duplicates in same batch
+
+                # Bulk insert when batch is full
+                if len(colleges_to_create) >= batch_size:
+                    with transaction.atomic():
+                        College.objects.bulk_create(
+                            colleges_to_create,
+                            ignore_conflicts=True
+                        )
+                    total_created += len(colleges_to_create)
+                    self.stdout.write(
+                        f'  Processed {total_processed:,} rows, created {total_created:,} colleges...'
+                    )
+                    colleges_to_create = []
+
+            # Insert remaining records
+            if colleges_to_create:
+                with transaction.atomic():
+                    College.objects.bulk_create(
+                        colleges_to_create,
+                        ignore_conflicts=True
+                    )
+                total_created += len(colleges_to_create)
+
+        return total_processed, total_created, skipped
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from core.cache import METRIC_EVENTS, metrics
+
+
+class Command(BaseCommand):
+    help = 'Report hit/miss counts of the versioned cache (core.cache) per cached function or view'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Clear the shared counters after reporting them'
+        )
+
+    def handle(self, *args, **options):
+        stats = metrics.shared()
+        if not stats:
+            self.stdout.write('No cache metrics recorded yet (processes flush every CACHE_METRICS_FLUSH_INTERVAL seconds)')
+            return
+
+        width = max(len(label) for label in stats)
+        self.stdout.write(f'{"label":<{width}}  ' + '  '.join(f'{event:>11}' for event in METRIC_EVENTS) + '  hit ratio')
+        for label, counts in sorted(stats.items()):
+            hits = counts['local_hits'] + counts['shared_hits']
+            total = hits + counts['misses']
+            ratio = f'{hits / total:.1%}' if total else '-'
+            self.stdout.write(
+                f'{label:<{width}}  ' + '  '.join(f'{counts[event]:>11,}' for event in METRIC_EVENTS) + f'  {ratio:>9}'
+            )
+
+        if options['reset']:
+            metrics.reset()
+            self.stdout.write(self.style.SUCCESS('Counters reset'))
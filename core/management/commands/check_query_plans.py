@@ -0,0 +1,111 @@
+import time
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from assessments.models import Assessment, Question, UserResponse
+from courses.models import CourseBundle, Enrollment
+from users.models import CustomUser, UserSummary
+
+# Markers of a full table scan in EXPLAIN output (PostgreSQL, SQLite)
+SEQ_SCAN_MARKERS = {
+    'postgresql': lambda line: 'Seq Scan' in line,
+    'sqlite': lambda line: line.lstrip(' -|`').startswith('SCAN ') and ' INDEX ' not in line,
+}
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot per-user queries and fail if any plan uses a sequential scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed-users',
+            type=int,
+            default=0,
+            help='First insert synthetic users with assessments, responses and enrollments (e.g. 1000000)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Users per insert batch when seeding (default: 10000)'
+        )
+
+    def handle(self, *args, **options):
+        if options['seed_users']:
+            self.seed(options['seed_users'], options['batch_size'])
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        user_id, mobile, email = CustomUser.objects.order_by('-id').values_list('id', 'mobile', 'email').first() or (None,) * 3
+        assessment = Assessment.objects.order_by('-id').values('id', 'question_order').first()
+        if user_id is None or assessment is None:
+            raise CommandError('No users/assessments to plan against; run with --seed-users')
+        question_id = (assessment['question_order'] or [0])[0]
+
+        # (label, queryset) mirroring the lookups made by the views
+        queries = [
+            ('latest completed assessment',
+             Assessment.objects.filter(user_id=user_id, status='completed').order_by('-id')[:1]),
+            ('pending assessments',
+             Assessment.objects.filter(user_id=user_id, status='pending')),
+            ('active enrollment',
+             Enrollment.objects.filter(user_id=user_id, status='active').order_by('id')[:1]),
+            ('response for question',
+             UserResponse.objects.filter(assessment_id=assessment['id'], question_id=question_id)),
+            ('responses of assessment',
+             UserResponse.objects.filter(assessment_id=assessment['id'])),
+            ('user summary',
+             UserSummary.objects.filter(user_id=user_id)),
+            ('login by mobile',
+             CustomUser.objects.for_identifier(mobile or '')),
+            ('login by email',
+             CustomUser.objects.for_identifier(email or '@')),
+        ]
+
+        is_seq_scan = SEQ_SCAN_MARKERS.get(connection.vendor, lambda line: False)
+        failures = []
+        for label, queryset in queries:
+            plan = queryset.explain()
+            scans = [line for line in plan.splitlines() if is_seq_scan(line)]
+            status = self.style.ERROR('SEQ SCAN') if scans else self.style.SUCCESS('ok')
+            self.stdout.write(f'{label}: {status}')
+            for line in plan.splitlines():
+                self.stdout.write(f'    {line}')
+            if scans:
+                failures.append(label)
+
+        if failures:
+            raise CommandError(f'Sequential scans in: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS(f'All {len(queries)} hot queries use indexes'))
+
+    def seed(self, target, batch_size):
+        """Users with one completed assessment (with responses) each; every other user enrolled."""
+        questions = list(Question.objects.values_list('id', flat=True)[:7])
+        course = CourseBundle.objects.first()
+        if not questions or course is None:
+            raise CommandError('Seeding needs questions and a course bundle; run the import commands first')
+
+        password = make_password(None)
+        existing = CustomUser.objects.filter(mobile__startswith='S').count()
+        start = time.perf_counter()
+        for offset in range(existing, target, batch_size):
+            with transaction.atomic():
+                users = CustomUser.objects.bulk_create([
+                    CustomUser(mobile=f'S{n:010d}', email=f'seed{n}@example.com', password=password)
+                    for n in range(offset, min(offset + batch_size, target))
+                ])
+                assessments = Assessment.objects.bulk_create([
+                    Assessment(user=user, status='completed', score=70, question_order=questions)
+                    for user in users
+                ])
+                UserResponse.objects.bulk_create([
+                    UserResponse(assessment=assessment, question_id=question_id, selected_option='A')
+                    for assessment in assessments for question_id in questions
+                ])
+                Enrollment.objects.bulk_create([
+                    Enrollment(user=user, course=course, status='active')
+                    for user in users[::2]
+                ])
+            self.stdout.write(f'  Seeded {min(offset + batch_size, target):,}/{target:,} users '
+                              f'({time.perf_counter() - start:.0f}s)')
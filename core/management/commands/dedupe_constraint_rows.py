@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max
+from assessments.models import UserResponse
+from courses.models import Enrollment
+from users.models import UserSummary
+
+
+class Command(BaseCommand):
+    help = (
+        'Remove rows that violate unique_response_per_question and one_active_enrollment_per_user; '
+        'run before the migration that adds those constraints'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many rows would change'
+        )
+
+    def handle(self, *args, **options):
+        # Per (assessment, question) the latest answer wins, like UserResponse.objects.record()
+        latest_responses = (
+            UserResponse.objects.values('assessment_id', 'question_id').annotate(keep=Max('id')).values('keep')
+        )
+        duplicate_responses = UserResponse.objects.exclude(id__in=latest_responses)
+
+        # Per user the latest active enrollment stays active; the others are dropped, not deleted
+        active = Enrollment.objects.filter(status='active')
+        latest_active = active.values('user_id').annotate(keep=Max('id')).values('keep')
+        extra_enrollments = active.exclude(id__in=latest_active)
+
+        if options['dry_run']:
+            users = extra_enrollments.values('user_id').annotate(n=Count('id')).count()
+            self.stdout.write(
+                f'Would delete {duplicate_responses.count():,} duplicate responses and drop '
+                f'{extra_enrollments.count():,} extra active enrollments of {users:,} users'
+            )
+            return
+
+        with transaction.atomic():
+            user_ids = list(extra_enrollments.values_list('user_id', flat=True).distinct())
+            dropped = extra_enrollments.update(status='dropped')
+            deleted, _ = duplicate_responses.delete()
+            # update() skips the signals that keep summaries pointing at the active enrollment
+            for user_id in user_ids:
+                UserSummary.objects.refresh_enrollment(user_id)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Cleanup complete!\n'
+            f'  Duplicate responses deleted: {deleted:,}\n'
+            f'  Extra active enrollments dropped: {dropped:,} ({len(user_ids):,} users)'
+        ))
@@ -1,85 +1,30 @@
-import csv
-from django.core.management.base import BaseCommand
+from core.bulk import mapped_csv_rows
+from core.management.importer import IncrementalImportCommand, sync_table
 from core.models import City, State, CityState
 
 
-class Command(BaseCommand):
+class Command(IncrementalImportCommand):
     help = 'Import city-state mappings from CSV file into City, State, and CityState models'
+    default_file = 'data/city_state_jan.csv'
+    namespaces = ('core.city', 'core.state', 'core.citystate')
 
-    def add_arguments(self, parser):
-        parser.add_argument(
-            '--file',
-            type=str,
-            default='data/city_state_jan.csv',
-            help='Path to the CSV file (default: data/city_state_jan.csv)'
-        )
+    def sync(self, path, options):
+        prune, batch_size = options['prune'], options['batch_size']
+
+        # Columns are positional: city_id, name (city), state_id, name (state)
+        pairs = {}
+        for row in mapped_csv_rows(path):
+            if len(row) >= 4 and row[1].strip() and row[3].strip():
+                pairs[row[1].strip(), row[3].strip()] = None
 
-    def handle(self, *args, **options):
-        csv_file = options['file']
-        
-        self.stdout.write(self.style.NOTICE(f'Reading from {csv_file}...'))
-        
-        city_created_count = 0
-        state_created_count = 0
-        mapping_created_count = 0
-        mapping_skipped_count = 0
-        
-        try:
-            with open(csv_file, 'r', encoding='utf-8') as file:
-                reader = csv.reader(file)
-                
-                # Skip header row
-                header = next(reader)
-                self.stdout.write(f'Header: {header}')
-                
-                for row in reader:
-                    if len(row) < 4:
-                        continue
-                    
-                    city_id_csv = row[0].strip()
-                    city_name = row[1].strip()
-                    state_id_csv = row[2].strip()
-                    state_name = row[3].strip()
-                    
-                    if not city_name or not state_name:
-                        mapping_skipped_count += 1
-                        continue
-                    
-                    # Get or create City (unique by name)
-                    city, city_created = City.objects.get_or_create(
-                        name=city_name
-                    )
-                    if city_created:
-                        city_created_count += 1
-                    
-                    # Get or create State (unique by name)
-                    state, state_created = State.objects.get_or_create(
-                        name=state_name
-                    )
-                    if state_created:
-                        state_created_count += 1
-                    
-                    # Create CityState mapping if not exists (one city can be mapped to multiple states)
-                    city_state, mapping_created = CityState.objects.get_or_create(
-                        city=city,
-                        state=state
-                    )
-                    if mapping_created:
-                        mapping_created_count += 1
-                    else:
-                        mapping_skipped_count += 1
-                        
-        except FileNotFoundError:
-            self.stdout.write(self.style.ERROR(f'File not found: {csv_file}'))
-            return
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f'Error: {str(e)}'))
-            return
-        
-        self.stdout.write(self.style.SUCCESS(
-            f'Import completed!\n'
-            f'  Cities created: {city_created_count}\n'
-            f'  States created: {state_created_count}\n'
-            f'  CityState mappings created: {mapping_created_count}\n'
-            f'  CityState mappings skipped (duplicates): {mapping_skipped_count}'
-        ))
+        states = sync_table(State, ['name'], [], [(state,) for state in {s for _, s in pairs}], prune, batch_size)
+        cities = sync_table(City, ['name'], [], [(city,) for city in {c for c, _ in pairs}], prune, batch_size)
+
+        state_ids = dict(State.objects.values_list('name', 'id'))
+        city_ids = dict(City.objects.values_list('name', 'id'))
+        mappings = sync_table(
+            CityState, ['city_id', 'state_id'], [],
+            [(city_ids[city], state_ids[state]) for city, state in pairs],
+            prune, batch_size,
+        )
+        return [('States', states), ('Cities', cities), ('CityState mappings', mappings)]
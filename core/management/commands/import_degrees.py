@@ -1,32 +1,20 @@
 import csv
-from django.core.management.base import BaseCommand
+from core.management.importer import IncrementalImportCommand, sync_table
 from core.models import Degree
 
-class Command(BaseCommand):
+
+class Command(IncrementalImportCommand):
     help = 'Import degrees from CSV file'
+    default_file = 'data/degrees.csv'
+    namespaces = ('core.degree',)
 
-    def handle(self, *args, **options):
-        csv_path = 'data/degrees.csv'
-        
-        with open(csv_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            created_count = 0
-            updated_count = 0
-            
-            for row in reader:
-                degree, created = Degree.objects.update_or_create(
-                    name=row['name'],
-                    defaults={
-                        'full_name': row['full_name'],
-                        'category': row['category'],
-                        'is_tech': row['is_tech'],
-                    }
-                )
-                if created:
-                    created_count += 1
-                else:
-                    updated_count += 1
-        
-        self.stdout.write(
-            self.style.SUCCESS(f'Successfully imported degrees: {created_count} created, {updated_count} updated')
+    def sync(self, path, options):
+        with open(path, 'r', encoding='utf-8') as file:
+            rows = [
+                (row['name'], row['full_name'], row['category'], row['is_tech'])
+                for row in csv.DictReader(file)
+            ]
+        result = sync_table(
+            Degree, ['name'], ['full_name', 'category', 'is_tech'], rows, options['prune'], options['batch_size']
         )
+        return [('Degrees', result)]
@@ -23,7 +23,7 @@ class CityState(models.Model):
         return f"{self.city.name} - {self.state.name}"
 
 class College(models.Model):
-    name = models.CharField(max_length=500,default=None, db_index=True)
+    name = models.CharField(max_length=500,default=None, unique=True)
     short_name = models.CharField(max_length=255,default=None)
 
     def __str__(self):
@@ -58,4 +58,14 @@ class Degree(models.Model):
     name = models.CharField(max_length=100, db_index=True)
     full_name = models.CharField(max_length=255, db_index=True)
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES)
-    is_tech = models.BooleanField(default=False)
\ No newline at end of file
+    is_tech = models.BooleanField(default=False)
+
+
+class ImportRecord(models.Model):
+    """Hash of the last file imported by an incremental import command (core.management.importer)."""
+    source = models.CharField(max_length=255, unique=True)  # "<command>:<path>"
+    file_hash = models.CharField(max_length=64)
+    imported_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.source
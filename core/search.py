@@ -0,0 +1,363 @@
+"""
+In-process autocomplete indexes for the reference tables (State, City,
+College, Branch).
+
+Each index keeps a snapshot of ``(id, name)`` rows sorted by normalized name
+plus a trigram posting list, so a query is answered with a binary search
+(prefix matches) and a trigram posting-list walk (substring matches) instead
+of a ``LIKE '%q%'`` scan in the database.
+
+Snapshots are built lazily on first use and rebuilt when the namespace
+version in ``core.cache`` moves (ORM writes bump it through signals; the
+import commands disconnect those with ``signals_disconnected()`` and bump it
+once) or after ``SEARCH_INDEX_MAX_AGE`` seconds, whichever comes first.
+
+With ``SEARCH_BACKEND = 'database'`` the same API is served by the database
+instead: on PostgreSQL through ``pg_trgm`` GIN indexes ranked by trigram word
+similarity, elsewhere (SQLite) through ``icontains`` ranked prefix-first.
+"""
+import bisect
+import logging
+import threading
+import time
+from array import array
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Greatest, Upper
+from django.db.models.signals import post_delete, post_save
+
+from .cache import bump_version, get_versions
+
+logger = logging.getLogger(__name__)
+
+# (table, column) pairs that get a pg_trgm GIN index on UPPER(column) on
+# PostgreSQL, matching the UPPER() Django emits for icontains/istartswith.
+TRIGRAM_INDEXED_COLUMNS = [
+    ('core_state', 'name'),
+    ('core_city', 'name'),
+    ('core_college', 'name'),
+    ('core_branch', 'name'),
+    ('core_degree', 'name'),
+    ('core_degree', 'full_name'),
+]
+
+
+def normalize(text):
+    """Lower-case and collapse whitespace so lookups are case-insensitive."""
+    return ' '.join(text.lower().split())
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class _Snapshot:
+    """Immutable, sorted view of a table used to answer queries."""
+
+    def __init__(self, rows):
+        rows = sorted(
+            ((normalize(name), pk, name) for pk, name in rows if name),
+            key=lambda row: (row[0], row[1]),
+        )
+        self.keys = [row[0] for row in rows]
+        self.ids = array('q', (row[1] for row in rows))
+        self.names = [row[2] for row in rows]
+
+        postings = {}
+        for position, key in enumerate(self.keys):
+            for gram in trigrams(key):
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array('I')
+                posting.append(position)
+        self.postings = postings
+
+    def prefix_range(self, query):
+        start = bisect.bisect_left(self.keys, query)
+        end = bisect.bisect_left(self.keys, query + '\uffff', lo=start)
+        return start, end
+
+    def substring_candidates(self, query):
+        """
+        Positions that may contain ``query``, in name order.
+
+        Walks the shortest posting list among the query's trigrams; callers
+        verify the actual substring match.
+        """
+        grams = trigrams(query)
+        if not grams:
+            return range(len(self.keys))
+        shortest = None
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                return ()
+            if shortest is None or len(posting) < len(shortest):
+                shortest = posting
+        return shortest
+
+    def search(self, query, limit):
+        """Up to ``limit`` rows containing the normalized ``query``, prefix matches first."""
+        start, end = self.prefix_range(query)
+        positions = list(range(start, min(end, start + limit)))
+
+        if query and len(positions) < limit:
+            for pos in self.substring_candidates(query):
+                if start <= pos < end:
+                    continue
+                if query in self.keys[pos]:
+                    positions.append(pos)
+                    if len(positions) >= limit:
+                        break
+        return [{'id': self.ids[pos], 'name': self.names[pos]} for pos in positions]
+
+
+class _StateSnapshot:
+    """One ``_Snapshot`` of city names per state, so filtered lookups never touch CityState."""
+
+    def __init__(self, rows):
+        by_state = defaultdict(list)
+        for state_id, pk, name in rows:
+            by_state[state_id].append((pk, name))
+        self.states = {state_id: _Snapshot(cities) for state_id, cities in by_state.items()}
+
+
+class SearchIndex:
+    """
+    Autocomplete index over ``model.<field>``.
+
+    ``search()`` returns ``[{'id': ..., 'name': ...}]`` with prefix matches
+    first and the remaining substring matches after, both in name order.
+    """
+
+    def __init__(self, model, field='name'):
+        self.model = model
+        self.field = field
+        self.namespaces = (model._meta.label_lower,)
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    @property
+    def max_age(self):
+        return getattr(settings, 'SEARCH_INDEX_MAX_AGE', 600)
+
+    def load_rows(self):
+        return self.model.objects.values_list('id', self.field).iterator(chunk_size=10000)
+
+    def build(self):
+        return _Snapshot(self.load_rows())
+
+    def snapshot(self):
+        """
+        Return the current snapshot, building it if needed.
+
+        Only the first build blocks; once a snapshot exists, an expired or
+        outdated one keeps being served while a single thread rebuilds it.
+        """
+        version = get_versions(*self.namespaces)
+        snapshot = self._snapshot
+        if snapshot is not None:
+            stale = snapshot.version != version or time.monotonic() - snapshot.built_at >= self.max_age
+            if stale and self._lock.acquire(blocking=False):
+                try:
+                    self._snapshot = snapshot = self._build(version)
+                finally:
+                    self._lock.release()
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None:
+                self._snapshot = snapshot = self._build(version)
+        return snapshot
+
+    def _build(self, version):
+        snapshot = self.build()
+        snapshot.version = version
+        snapshot.built_at = time.monotonic()
+        return snapshot
+
+    def search(self, query, limit=10):
+        """Return up to ``limit`` rows whose name contains ``query``."""
+        return self.snapshot().search(normalize(query), limit)
+
+
+class CityStateIndex(SearchIndex):
+    """
+    Cities of one state, for the dependent city dropdown.
+
+    Built with a single join over CityState; afterwards a lookup is a dict
+    access plus the same prefix search and trigram posting-list walk as the
+    other indexes, over that state's cities only.
+    """
+
+    def __init__(self):
+        from .models import City
+
+        super().__init__(City)
+        self.namespaces = ('core.city', 'core.citystate')
+
+    def load_rows(self):
+        from .models import CityState
+
+        return CityState.objects.values_list('state_id', 'city_id', 'city__name').iterator(chunk_size=10000)
+
+    def build(self):
+        return _StateSnapshot(self.load_rows())
+
+    def search(self, state_id, query, limit=10):
+        """Return up to ``limit`` cities of ``state_id`` whose name contains ``query``."""
+        try:
+            state_id = int(state_id)
+        except (TypeError, ValueError):
+            return []
+        cities = self.snapshot().states.get(state_id)
+        if cities is None:
+            return []
+        return cities.search(normalize(query), limit)
+
+
+def ranked_search(queryset, fields, query):
+    """
+    Filter ``queryset`` to rows where any of ``fields`` matches ``query`` and
+    order the best matches first.
+
+    On PostgreSQL a row matches on ``icontains`` or trigram word similarity
+    and is ordered by ``similarity DESC``; both operators are served by the
+    GIN indexes from ``create_trigram_indexes``. Queries shorter than a
+    trigram only match on prefix. Other databases fall back to ``icontains`` with
+    prefix matches first.
+    """
+    query = query.strip()
+    if not query:
+        return queryset.order_by(fields[0])
+
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql' and len(query) < 3:
+        # Shorter than one trigram: substring and similarity matches are too
+        # unselective, so only anchored prefixes are matched.
+        match = Q()
+        for field in fields:
+            match |= Q(**{f'{field}__istartswith': query})
+        return queryset.filter(match).order_by(fields[0])
+
+    match = Q()
+    for field in fields:
+        match |= Q(**{f'{field}__icontains': query})
+        if vendor == 'postgresql':
+            # UPPER() so the operator hits the same expression index as icontains.
+            queryset = queryset.alias(**{f'{field}_upper': Upper(field)})
+            match |= Q(**{f'{field}_upper__trigram_word_similar': query})
+    queryset = queryset.filter(match)
+
+    if vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        similarities = [TrigramWordSimilarity(query, field) for field in fields]
+        rank = similarities[0] if len(similarities) == 1 else Greatest(*similarities)
+        return queryset.annotate(similarity=rank).order_by('-similarity', fields[0])
+
+    prefix = Case(
+        *[When(**{f'{field}__istartswith': query}, then=Value(0)) for field in fields],
+        default=Value(1),
+        output_field=IntegerField(),
+    )
+    return queryset.annotate(prefix_rank=prefix).order_by('prefix_rank', fields[0])
+
+
+class DatabaseIndex:
+    """``SearchIndex`` counterpart that queries the database on every call."""
+
+    def __init__(self, model, field='name'):
+        self.model = model
+        self.field = field
+
+    def search(self, query, limit=10):
+        queryset = ranked_search(self.model.objects.all(), [self.field], query)
+        return list(queryset.values('id', self.field)[:limit])
+
+
+def create_trigram_indexes(using='default', **kwargs):
+    """
+    ``post_migrate`` hook that installs ``pg_trgm`` and the GIN indexes in
+    ``TRIGRAM_INDEXED_COLUMNS``. Does nothing on other databases.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    statements = ['CREATE EXTENSION IF NOT EXISTS pg_trgm']
+    statements += [
+        f'CREATE INDEX IF NOT EXISTS {table}_{column}_upper_trgm '
+        f'ON {table} USING gin (UPPER({column}) gin_trgm_ops)'
+        for table, column in TRIGRAM_INDEXED_COLUMNS
+    ]
+    for statement in statements:
+        try:
+            with transaction.atomic(using=using), connection.cursor() as cursor:
+                cursor.execute(statement)
+        except DatabaseError as e:
+            logger.warning('Could not run "%s": %s', statement, e)
+
+
+_indexes = {}
+
+
+def get_index(model):
+    """Return the search backend for ``model`` selected by ``SEARCH_BACKEND``."""
+    index = _indexes.get(model)
+    if index is None:
+        backend = getattr(settings, 'SEARCH_BACKEND', 'memory')
+        index_class = DatabaseIndex if backend == 'database' else SearchIndex
+        index = _indexes.setdefault(model, index_class(model))
+    return index
+
+
+_city_state_index = None
+
+
+def get_city_state_index():
+    global _city_state_index
+    if _city_state_index is None:
+        _city_state_index = CityStateIndex()
+    return _city_state_index
+
+
+def bump_model_version(sender, **kwargs):
+    """Signal receiver: a reference row changed through the ORM."""
+    bump_version(sender._meta.label_lower)
+
+
+def _signal_models():
+    from .models import Branch, City, CityState, College, Degree, State
+
+    return (State, City, CityState, College, Branch, Degree)
+
+
+def connect_signals():
+    for model in _signal_models():
+        post_save.connect(bump_model_version, sender=model)
+        post_delete.connect(bump_model_version, sender=model)
+
+
+@contextmanager
+def signals_disconnected(*namespaces):
+    """
+    Disconnect the per-row receivers inside the block and bump ``namespaces``
+    once on exit. For the import commands: with no receivers Django can
+    fast-delete (one ``DELETE``, no rows loaded) tables nothing else points
+    at, and nothing is bumped per row. Receivers are process-wide, so this
+    belongs in management commands, not request handling.
+    """
+    models = _signal_models()
+    for model in models:
+        post_save.disconnect(bump_model_version, sender=model)
+        post_delete.disconnect(bump_model_version, sender=model)
+    try:
+        yield
+    finally:
+        connect_signals()
+        if namespaces:
+            bump_version(*namespaces)
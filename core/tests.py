@@ -1,3 +1,298 @@
-from django.test import TestCase
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import JsonResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from . import autocomplete, views
+from .bulk import mapped_csv_rows
+from .cache import _local_versions, bump_version, cached, get_or_set, get_version, local_cache, metrics
+from .management.importer import SyncResult, sync_table
+from .models import City, CityState, College, Degree, State
+from .search import CityStateIndex, DatabaseIndex, SearchIndex, ranked_search, signals_disconnected
+
+
+class VersionedCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        _local_versions.clear()
+        metrics.reset()
+
+    def test_bump_version_invalidates(self):
+        calls = []
+
+        @cached('tests.things')
+        def things(n):
+            calls.append(n)
+            return [n] * n
+
+        self.assertEqual(things(2), [2, 2])
+        self.assertEqual(things(2), [2, 2])
+        self.assertEqual(calls, [2])
+
+        bump_version('tests.things')
+        self.assertEqual(things(2), [2, 2])
+        self.assertEqual(calls, [2, 2])
+
+    def test_local_hit_skips_shared_cache(self):
+        get_or_set('tests.local', lambda: 'computed', namespaces=('tests.ns',))
+        with mock.patch.object(cache, 'get_many') as get_many, mock.patch.object(cache, 'get') as get:
+            self.assertEqual(get_or_set('tests.local', lambda: 'recomputed', namespaces=('tests.ns',)), 'computed')
+        get_many.assert_not_called()
+        get.assert_not_called()
+
+    def test_shared_tier_serves_after_local_eviction(self):
+        get_or_set('tests.value', lambda: 'computed', namespaces=('tests.ns',))
+        local_cache.clear()
+        self.assertEqual(get_or_set('tests.value', lambda: 'recomputed', namespaces=('tests.ns',)), 'computed')
+        self.assertEqual(metrics.snapshot()['tests.value']['shared_hits'], 1)
+
+    def test_none_is_cached(self):
+        calls = []
+        for _ in range(2):
+            get_or_set('tests.none', lambda: calls.append(1))
+        self.assertEqual(len(calls), 1)
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.3)
+            return 42
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(get_or_set('tests.slow', slow))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [42] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_waiter_stops_waiting_when_holder_fails(self):
+        def failing():
+            time.sleep(0.2)
+            raise RuntimeError('boom')
+
+        def holder():
+            with self.assertRaises(RuntimeError):
+                get_or_set('tests.failing', failing)
+
+        thread = threading.Thread(target=holder)
+        thread.start()
+        time.sleep(0.05)
+        start = time.monotonic()
+        self.assertEqual(get_or_set('tests.failing', lambda: 'fallback'), 'fallback')
+        thread.join()
+        self.assertLess(time.monotonic() - start, 1)
+
+
+class SearchSignalTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        _local_versions.clear()
+
+    def test_orm_write_bumps_namespace(self):
+        before = get_version('core.college')
+        College.objects.create(name='Alpha College', short_name='')
+        self.assertNotEqual(get_version('core.college'), before)
+
+    def test_disconnected_block_bumps_once(self):
+        College.objects.bulk_create([College(name=f'College {n}', short_name='') for n in range(3)])
+        before = get_version('core.college')
+        with mock.patch('core.search.bump_version', wraps=bump_version) as bump:
+            with signals_disconnected('core.college'):
+                College.objects.create(name='Beta College', short_name='')
+                College.objects.all().delete()
+                self.assertEqual(get_version('core.college'), before)
+        bump.assert_called_once_with('core.college')
+        self.assertNotEqual(get_version('core.college'), before)
+
+        # Receivers are back after the block
+        before = get_version('core.college')
+        College.objects.create(name='Gamma College', short_name='')
+        self.assertNotEqual(get_version('core.college'), before)
+
+
+@override_settings(AUTOCOMPLETE_CACHE_MAX_AGE=120)
+class CachedJsonViewTests(TestCase):
+    url = '/core/api/colleges/'
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        _local_versions.clear()
+        College.objects.create(name='Alpha College', short_name='')
+
+    def test_etag_and_not_modified(self):
+        with mock.patch('core.views.get_index', wraps=views.get_index) as get_index:
+            response = self.client.get(self.url, {'q': 'alpha'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([row['name'] for row in response.json()], ['Alpha College'])
+            etag = response['ETag']
+            self.assertIn('max-age=120', response['Cache-Control'])
+            self.assertIn('public', response['Cache-Control'])
+
+            # Case and whitespace don't change the key
+            self.assertEqual(self.client.get(self.url, {'q': ' ALPHA '})['ETag'], etag)
+            self.assertEqual(get_index.call_count, 1)
+
+            response = self.client.get(self.url, {'q': 'alpha'}, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response['ETag'], etag)
+            self.assertEqual(get_index.call_count, 1)
+
+            self.assertNotEqual(self.client.get(self.url, {'q': 'beta'})['ETag'], etag)
+
+        # A write moves the version, so the old ETag no longer matches
+        College.objects.create(name='Alpha Institute', short_name='')
+        response = self.client.get(self.url, {'q': 'alpha'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_error_responses_are_not_cached(self):
+        def unavailable(data, safe=True):
+            return JsonResponse({'error': 'unavailable'}, status=503)
+
+        with mock.patch('core.views.JsonResponse', side_effect=unavailable):
+            response = self.client.get(self.url, {'q': 'alpha'})
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.has_header('ETag'))
+
+        response = self.client.get(self.url, {'q': 'alpha'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['name'] for row in response.json()], ['Alpha College'])
+
+
+@override_settings(STORAGES={'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}})
+class AutocompleteShardTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        self.dir = Path(root) / 'autocomplete'
+        self.settings = override_settings(AUTOCOMPLETE_SHARDS_DIR=self.dir)
+        self.settings.enable()
+        self.addCleanup(self.settings.disable)
+
+    def test_word_shards(self):
+        self.assertEqual(autocomplete.word_shards('St. Xavier  College', 2), {'st', 'xa', 'co'})
+        self.assertEqual(autocomplete.word_shards('A B', 2), {'a_', 'b'})
+        self.assertEqual(autocomplete.shard_key('a b', 2), 'a_')
+
+    def test_shard_urls_picks_up_a_later_build(self):
+        self.assertIsNone(autocomplete.shard_urls())
+
+        College.objects.create(name='Xavier College', short_name='')
+        call_command('build_autocomplete_shards', stdout=mock.Mock())
+        urls = autocomplete.shard_urls()
+        self.assertEqual(urls['colleges']['length'], 2)
+        self.assertEqual(set(urls['colleges']['urls']), {'xa', 'co'})
+        self.assertTrue(urls['colleges']['urls']['xa'].endswith('autocomplete/colleges/xa.json'))
+
+
+class MappedCsvRowsTests(SimpleTestCase):
+    def setUp(self):
+        self.dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def rows(self, data, **kwargs):
+        path = self.dir / 'data.csv'
+        path.write_bytes(data)
+        return list(mapped_csv_rows(path, **kwargs))
+
+    def test_rows(self):
+        data = '\ufeffcity_id,name,state_id,name\r\n1,Pune,2,Maharashtra\r\n3,"Navi\r\nMumbai",2,"Mahā, rashtra"'
+        self.assertEqual(self.rows(data.encode('utf-8')), [
+            ['1', 'Pune', '2', 'Maharashtra'], ['3', 'Navi\r\nMumbai', '2', 'Mahā, rashtra'],
+        ])
+        self.assertEqual(self.rows(data.encode('utf-8'), skip_header=False)[0], ['city_id', 'name', 'state_id', 'name'])
+
+    def test_empty_file(self):
+        self.assertEqual(self.rows(b''), [])
+        self.assertEqual(self.rows(b'city_id,name\n'), [])
+
+
+class SyncTableTests(TestCase):
+    fields = (['name'], ['full_name', 'category', 'is_tech'])
+
+    def sync(self, rows, prune=False):
+        return sync_table(Degree, *self.fields, rows, prune=prune)
+
+    def test_rerun_is_a_no_op(self):
+        rows = [('B.Tech', 'Bachelor of Technology', 'Engineering & Technology', 'True'),
+                ('B.A', 'Bachelor of Arts', 'Arts & Humanities', '0')]
+        self.assertEqual(self.sync(rows), SyncResult(2, 0, 0, 0))
+        # 'True'/'0' compare equal to the stored booleans, so nothing is written
+        with self.assertNumQueries(1):
+            self.assertEqual(self.sync(rows), SyncResult(0, 0, 0, 2))
+
+    def test_changes_and_prune(self):
+        self.sync([('B.Tech', 'Bachelor of Technology', 'Engineering & Technology', True),
+                   ('B.A', 'Bachelor of Arts', 'Arts & Humanities', False)])
+        result = self.sync([('B.Tech', 'Bachelor of Technology', 'Computer & IT', True)], prune=True)
+        self.assertEqual(result, SyncResult(0, 1, 1, 0))
+        self.assertEqual(list(Degree.objects.values_list('name', 'category')), [('B.Tech', 'Computer & IT')])
+
+    def test_unchanged_file_is_skipped(self):
+        path = Path(tempfile.mkdtemp()) / 'degrees.csv'
+        self.addCleanup(shutil.rmtree, path.parent)
+        path.write_text('name,full_name,category,is_tech\nB.Tech,Bachelor of Technology,Computer & IT,True\n')
+        call_command('import_degrees', file=str(path), stdout=mock.Mock())
+        with mock.patch('core.management.commands.import_degrees.Command.sync') as sync:
+            call_command('import_degrees', file=str(path), stdout=mock.Mock())
+        sync.assert_not_called()
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        for name in ['National Institute of Technology', 'Indian Institute of Technology',
+                     'Institute of Chemical Technology', 'Anna University']:
+            College.objects.create(name=name, short_name='')
+
+    def names(self, rows):
+        return [row['name'] for row in rows]
+
+    def test_prefix_matches_rank_ahead_of_substring_matches(self):
+        index = SearchIndex(College)
+        self.assertEqual(self.names(index.search('INSTITUTE')), [
+            'Institute of Chemical Technology', 'Indian Institute of Technology', 'National Institute of Technology',
+        ])
+        self.assertEqual(self.names(index.search('in', limit=2)), [
+            'Indian Institute of Technology', 'Institute of Chemical Technology',
+        ])
+        self.assertEqual(self.names(index.search('versity')), ['Anna University'])
+        self.assertEqual(index.search('polytechnic'), [])
+
+    def test_ranked_search_falls_back_to_icontains_prefix_first(self):
+        queryset = ranked_search(College.objects.all(), ['name', 'short_name'], ' institute ')
+        self.assertEqual(list(queryset.values_list('name', flat=True)), [
+            'Institute of Chemical Technology', 'Indian Institute of Technology', 'National Institute of Technology',
+        ])
+        self.assertEqual(ranked_search(College.objects.all(), ['name'], '').count(), 4)
+        self.assertEqual(self.names(DatabaseIndex(College).search('in', limit=2)), [
+            'Indian Institute of Technology', 'Institute of Chemical Technology',
+        ])
+
+
+class CityStateIndexTests(TestCase):
+    def test_prefix_then_substring_matches_within_state(self):
+        karnataka, kerala = State.objects.create(name='Karnataka'), State.objects.create(name='Kerala')
+        for name, state in [('Mangalore', karnataka), ('Bangalore', karnataka), ('Mandya', karnataka),
+                            ('Malappuram', kerala)]:
+            CityState.objects.create(city=City.objects.create(name=name), state=state)
+
+        index = CityStateIndex()
+        self.assertEqual([row['name'] for row in index.search(karnataka.id, 'man')], ['Mandya', 'Mangalore'])
+        self.assertEqual([row['name'] for row in index.search(karnataka.id, 'galore')], ['Bangalore', 'Mangalore'])
+        self.assertEqual([row['name'] for row in index.search(karnataka.id, 'ga', limit=1)], ['Bangalore'])
+        self.assertEqual(index.search(kerala.id, 'galore'), [])
+        self.assertEqual(index.search('nope', 'man'), [])
@@ -1,31 +1,35 @@
 from django.http import JsonResponse
-from .models import State, City, College, Branch, CityState
+from .cache import cached_json_view
+from .models import State, City, College, Branch
+from .search import get_city_state_index, get_index
 
+@cached_json_view('core.state')
 def search_states(request):
     query = request.GET.get('q', '')
-    states = State.objects.filter(name__icontains=query).values('id', 'name')[:10]
-    return JsonResponse(list(states), safe=False)
+    states = get_index(State).search(query)
+    return JsonResponse(states, safe=False)
 
+@cached_json_view('core.city', 'core.citystate', params=('q', 'state_id'))
 def search_cities(request):
     query = request.GET.get('q', '')
     state_id = request.GET.get('state_id')
     
     if state_id:
-        # Get cities mapped to the selected state via CityState
-        city_ids = CityState.objects.filter(state_id=state_id).values_list('city_id', flat=True)
-        cities = City.objects.filter(id__in=city_ids, name__icontains=query)
+        # Cities mapped to the selected state, from the per-state index
+        cities = get_city_state_index().search(state_id, query)
     else:
-        cities = City.objects.filter(name__icontains=query)
+        cities = get_index(City).search(query)
     
-    cities = cities.values('id', 'name')[:10]
-    return JsonResponse(list(cities), safe=False)
+    return JsonResponse(cities, safe=False)
 
+@cached_json_view('core.college')
 def search_colleges(request):
     query = request.GET.get('q', '')
-    colleges = College.objects.filter(name__icontains=query).values('id', 'name')[:10]
-    return JsonResponse(list(colleges), safe=False)
+    colleges = get_index(College).search(query)
+    return JsonResponse(colleges, safe=False)
 
+@cached_json_view('core.branch')
 def search_branches(request):
     query = request.GET.get('q', '')
-    branches = Branch.objects.filter(name__icontains=query).values('id', 'name')[:10]
-    return JsonResponse(list(branches), safe=False)
+    branches = get_index(Branch).search(query)
+    return JsonResponse(branches, safe=False)
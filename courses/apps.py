@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import m2m_changed, post_delete, post_save
 
 
 class CoursesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'courses'
+
+    def ready(self):
+        from .bundle_cards import invalidate
+        from .models import CourseBundle
+        post_save.connect(invalidate, sender=CourseBundle)
+        post_delete.connect(invalidate, sender=CourseBundle)
+        m2m_changed.connect(invalidate, sender=CourseBundle.degrees.through)
@@ -0,0 +1,117 @@
+"""
+Degree -> course bundle recommendation cards, precomputed in the cache.
+
+Each degree has one cache entry holding the serialized cards of its active
+bundles (skills already split), so the assessment result page gets its
+bundle list from the two-tier cache (``core.cache``) instead of an M2M join
+with DISTINCT.
+
+``rebuild()`` bumps the ``courses.coursebundle`` namespace and recomputes
+every degree's entry in three queries. It runs at the end of
+``import_course_bundles`` and ``map_degrees_to_bundles`` and, through
+signals, after bundle edits made elsewhere (e.g. the admin). Commands wrap
+their writes in ``deferred()`` so those signals don't rebuild once per row.
+
+A command's bump reaches the web workers only through the shared cache
+(``REDIS_URL``, required in production). Entries also expire after
+``CARDS_TIMEOUT``, so without a shared cache cards are stale for at most
+that long.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.core.cache import cache
+
+from core.cache import bump_version, get_or_set, get_versions, versioned_key
+
+NAMESPACE = 'courses.coursebundle'
+
+# Every rebuild writes a new set of entries under a new version; the
+# superseded ones must expire rather than stay in the shared cache forever.
+# Recomputing a degree's cards on expiry is one small query.
+CARDS_TIMEOUT = 60 * 60
+
+CARD_FIELDS = (
+    'id', 'slug', 'career_title', 'skills_required', 'duration', 'original_price',
+    'discounted_price', 'next_batch_date', 'initial_salary',
+)
+
+_state = threading.local()
+
+
+def _key(degree_id):
+    return ['courses.bundle_cards', degree_id]
+
+
+def _card(row):
+    card = dict(row)
+    card['skills'] = [skill.strip() for skill in card.pop('skills_required').split(';')]
+    return card
+
+
+def _cards_by_degree(degree_ids=None):
+    from .models import CourseBundle
+
+    bundles = CourseBundle.objects.filter(is_active=True).order_by('id')
+    cards = {row['id']: _card(row) for row in bundles.values(*CARD_FIELDS)}
+
+    links = CourseBundle.degrees.through.objects.filter(coursebundle_id__in=cards.keys())
+    if degree_ids is not None:
+        links = links.filter(degree_id__in=degree_ids)
+    by_degree = {degree_id: [] for degree_id in degree_ids or ()}
+    for degree_id, bundle_id in links.order_by('coursebundle_id').values_list('degree_id', 'coursebundle_id'):
+        by_degree.setdefault(degree_id, []).append(cards[bundle_id])
+    return by_degree
+
+
+def active_cards():
+    """Cards of every active bundle, in bundle id order (computed, not cached)."""
+    from .models import CourseBundle
+
+    return [_card(row) for row in CourseBundle.objects.filter(is_active=True).order_by('id').values(*CARD_FIELDS)]
+
+
+def rebuild():
+    """Recompute the cards of every degree; returns the number of degrees cached."""
+    from core.models import Degree
+
+    bump_version(NAMESPACE)
+    by_degree = _cards_by_degree(list(Degree.objects.values_list('id', flat=True)))
+    versions = get_versions(NAMESPACE)
+    cache.set_many(
+        {versioned_key(_key(degree_id), versions=versions): cards for degree_id, cards in by_degree.items()},
+        timeout=CARDS_TIMEOUT,
+    )
+    return len(by_degree)
+
+
+def for_degree(degree_id):
+    """Bundle cards recommended for ``degree_id``, in bundle id order."""
+    if degree_id is None:
+        return []
+    # Computed here only if the cache was flushed or the degree added since the last rebuild
+    return get_or_set(
+        _key(degree_id), lambda: _cards_by_degree([degree_id])[degree_id],
+        namespaces=(NAMESPACE,), timeout=CARDS_TIMEOUT, label='courses.bundle_cards',
+    )
+
+
+@contextmanager
+def deferred():
+    """Suppress signal-driven rebuilds inside the block and rebuild once on exit."""
+    _state.deferred = True
+    try:
+        yield
+    finally:
+        _state.deferred = False
+    rebuild()
+
+
+def invalidate(action=None, **kwargs):
+    """Signal receiver for CourseBundle writes and degree mapping changes."""
+    # m2m_changed fires before and after each change; only the post_* ones
+    # see the new mapping
+    if action is not None and action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not getattr(_state, 'deferred', False):
+        rebuild()
@@ -1,6 +1,7 @@
 import csv
 from datetime import datetime
 from django.core.management.base import BaseCommand
+from courses import bundle_cards
 from courses.models import CourseBundle
 from core.models import Degree
 
@@ -18,7 +19,8 @@ class Command(BaseCommand):
         for csv_path in csv_files:
             self.stdout.write(f'Processing {csv_path}...')
             
-            with open(csv_path, 'r', encoding='utf-8') as file:
+            # Bundle cards are rebuilt once, after the file's bundles are written
+            with open(csv_path, 'r', encoding='utf-8') as file, bundle_cards.deferred():
                 reader = csv.DictReader(file)
                 
                 for row in reader:
@@ -1,60 +1,84 @@
 import csv
+import time
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.cache import bump_version
+from courses import bundle_cards
 from courses.models import CourseBundle
 from core.models import Degree
+from recommendations.engine import NAMESPACE as RECOMMENDATION_CATALOG
 
 class Command(BaseCommand):
     help = 'Map degrees to course bundles based on explicit mapping CSV'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            type=str,
+            default='data/degree_bundle_mapping.csv',
+            help='Path to the mapping CSV (default: data/degree_bundle_mapping.csv)'
+        )
+
     def handle(self, *args, **options):
-        csv_path = 'data/degree_bundle_mapping.csv'
-        
-        self.stdout.write('Clearing existing bundle-degree relationships...')
-        # Optional: Clear existing relationships if you want a fresh start
-        # CourseBundle.degrees.through.objects.all().delete()
-        
-        # Or just clear relationships for bundles that are being mapped?
-        # For now, let's just add relationships. If we want to replace, we should clear.
-        # Given "clear degree table" request earlier, user probably wants clean slate.
-        # But clearing ALL relationships might affect bundles not in CSV (if any).
-        # Let's iterate and link.
-        
-        # Better approach: Clear all relationships first to ensure valid state as per new mapping
-        for bundle in CourseBundle.objects.all():
-            bundle.degrees.clear()
-            
-        self.stdout.write('Cleared existing relationships. Starting mapping...')
+        csv_path = options['file']
+        start = time.perf_counter()
+
+        # Names are matched case-insensitively; the lowest id wins on duplicates
+        degrees = {}
+        for pk, name in Degree.objects.order_by('id').values_list('id', 'name'):
+            degrees.setdefault(name.strip().casefold(), pk)
+        bundles = {}
+        for pk, title in CourseBundle.objects.order_by('id').values_list('id', 'career_title'):
+            bundles.setdefault(title.strip().casefold(), pk)
 
+        desired = set()
+        missing_degrees = set()
+        missing_bundles = set()
         with open(csv_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            count = 0
-            missing_degrees = set()
-            missing_bundles = set()
-            
-            for row in reader:
+            for row in csv.DictReader(file):
                 degree_name = row['degree_name'].strip()
                 career_title = row['career_title'].strip()
-                
-                try:
-                    degree = Degree.objects.get(name__iexact=degree_name)
-                except Degree.DoesNotExist:
+                degree_id = degrees.get(degree_name.casefold())
+                bundle_id = bundles.get(career_title.casefold())
+                if degree_id is None:
                     missing_degrees.add(degree_name)
-                    continue
-                    
-                try:
-                    # Case insensitive search for title
-                    bundle = CourseBundle.objects.get(career_title__iexact=career_title)
-                except CourseBundle.DoesNotExist:
+                if bundle_id is None:
                     missing_bundles.add(career_title)
-                    continue
-                    
-                bundle.degrees.add(degree)
-                count += 1
-        
+                if degree_id is not None and bundle_id is not None:
+                    desired.add((bundle_id, degree_id))
+
+        # The CSV is the complete mapping: apply only the difference
+        Through = CourseBundle.degrees.through
+        current = {
+            (bundle_id, degree_id): pk
+            for pk, bundle_id, degree_id in Through.objects.values_list('id', 'coursebundle_id', 'degree_id')
+        }
+        to_add = desired - current.keys()
+        to_remove = [pk for key, pk in current.items() if key not in desired]
+
+        with transaction.atomic():
+            Through.objects.bulk_create([
+                Through(coursebundle_id=bundle_id, degree_id=degree_id) for bundle_id, degree_id in to_add
+            ])
+            if to_remove:
+                Through.objects.filter(id__in=to_remove).delete()
+
+        # Through-table bulk writes skip m2m_changed, so refresh dependents here
+        if to_add or to_remove:
+            bundle_cards.rebuild()
+            bump_version(RECOMMENDATION_CATALOG)
+
         if missing_degrees:
-            self.stdout.write(self.style.WARNING(f'Missing Degrees: {", ".join(missing_degrees)}'))
-            
+            self.stdout.write(self.style.WARNING(f'Missing Degrees: {", ".join(sorted(missing_degrees))}'))
+
         if missing_bundles:
-            self.stdout.write(self.style.WARNING(f'Missing Bundles: {", ".join(missing_bundles)}'))
+            self.stdout.write(self.style.WARNING(f'Missing Bundles: {", ".join(sorted(missing_bundles))}'))
 
-        self.stdout.write(self.style.SUCCESS(f'Successfully mapped {count} degree-bundle relationships'))
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully mapped {len(desired)} degree-bundle relationships\n'
+            f'  Added: {len(to_add)}\n'
+            f'  Removed: {len(to_remove)}\n'
+            f'  Unchanged: {len(desired) - len(to_add)}\n'
+            f'  Elapsed: {elapsed * 1000:.0f} ms'
+        ))
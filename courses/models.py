@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from users.models import CustomUser
 
 from django.utils.text import slugify
@@ -50,6 +51,15 @@ class Enrollment(models.Model):
     enrolled_at = models.DateTimeField(auto_now_add=True)
     progress = models.IntegerField(default=0, help_text="Percentage completed")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'status'], name='enrollment_user_status_idx'),
+        ]
+        constraints = [
+            # Also serves the "active enrollment of this user" lookup
+            models.UniqueConstraint(fields=['user'], condition=Q(status='active'), name='one_active_enrollment_per_user'),
+        ]
     
     def __str__(self):
         return f"{self.user.mobile} - {self.course.career_title} ({self.status})"
@@ -1,3 +1,109 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import date
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.cache import get_version, local_cache
+from core.models import Degree
+from recommendations.engine import NAMESPACE as RECOMMENDATION_CATALOG
+from . import bundle_cards
+from .models import CourseBundle
+from .views import active_bundles
+
+
+# The page links static files, which a checkout without collectstatic has no manifest for
+@override_settings(STORAGES={
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+class CourseListCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.bundle = CourseBundle.objects.create(
+            career_title='Data Analyst', skills_required='SQL; Excel', duration='3 months',
+            original_price=100, discounted_price=80, next_batch_date=date(2026, 1, 1),
+        )
+
+    def test_course_list_renders_cached_cards(self):
+        response = self.client.get('/courses/')
+        self.assertContains(response, 'Data Analyst')
+        self.assertContains(response, 'Excel')
+        with self.assertNumQueries(0):
+            self.assertEqual(active_bundles()[0]['skills'], ['SQL', 'Excel'])
+
+    def test_bundle_edit_invalidates(self):
+        active_bundles()
+        self.bundle.career_title = 'Business Analyst'
+        self.bundle.save()
+        self.assertEqual(active_bundles()[0]['career_title'], 'Business Analyst')
+
+    def test_degree_mapping_change_rebuilds_once(self):
+        degree = Degree.objects.create(name='B.Tech', full_name='Bachelor of Technology')
+        with mock.patch.object(bundle_cards, 'rebuild', wraps=bundle_cards.rebuild) as rebuild:
+            self.bundle.degrees.add(degree)
+        rebuild.assert_called_once_with()
+        self.assertEqual([card['id'] for card in bundle_cards.for_degree(degree.id)], [self.bundle.id])
+
+
+class MapDegreesToBundlesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.btech = Degree.objects.create(name='B.Tech', full_name='Bachelor of Technology')
+        self.bcom = Degree.objects.create(name='B.Com', full_name='Bachelor of Commerce')
+        self.analyst, self.developer = (
+            CourseBundle.objects.create(
+                career_title=title, skills_required='SQL', duration='3 months',
+                original_price=100, discounted_price=80, next_batch_date=date(2026, 1, 1), slug=slug,
+            )
+            for title, slug in [('Data Analyst', 'analyst'), ('Developer', 'developer')]
+        )
+
+    def map(self, *pairs):
+        path = self.dir / 'mapping.csv'
+        path.write_text('degree_name,career_title\n' + ''.join(f'{degree},{title}\n' for degree, title in pairs))
+        stdout = StringIO()
+        call_command('map_degrees_to_bundles', file=str(path), stdout=stdout)
+        return stdout.getvalue()
+
+    def mapping(self):
+        return set(CourseBundle.degrees.through.objects.values_list('coursebundle_id', 'degree_id'))
+
+    def test_applies_only_the_difference(self):
+        version = get_version(RECOMMENDATION_CATALOG)
+        output = self.map(('b.tech', 'Data Analyst'), ('B.Tech', 'developer'), ('B.Com', 'Data Analyst'))
+        self.assertIn('Added: 3', output)
+        self.assertEqual(self.mapping(), {
+            (self.analyst.id, self.btech.id), (self.developer.id, self.btech.id), (self.analyst.id, self.bcom.id),
+        })
+        self.assertNotEqual(get_version(RECOMMENDATION_CATALOG), version)
+        self.assertEqual([card['id'] for card in bundle_cards.for_degree(self.bcom.id)], [self.analyst.id])
+
+        # Second run with a changed mapping: one row kept, one added, two removed
+        version = get_version(RECOMMENDATION_CATALOG)
+        output = self.map(('B.Tech', 'Data Analyst'), ('B.Com', 'Developer'), ('M.Tech', 'Data Analyst'))
+        self.assertIn('Added: 1', output)
+        self.assertIn('Removed: 2', output)
+        self.assertIn('Unchanged: 1', output)
+        self.assertIn('Missing Degrees: M.Tech', output)
+        self.assertEqual(self.mapping(), {(self.analyst.id, self.btech.id), (self.developer.id, self.bcom.id)})
+        self.assertNotEqual(get_version(RECOMMENDATION_CATALOG), version)
+        self.assertEqual([card['id'] for card in bundle_cards.for_degree(self.bcom.id)], [self.developer.id])
+
+        # Re-running the same mapping changes nothing and leaves the catalog version alone
+        version = get_version(RECOMMENDATION_CATALOG)
+        with mock.patch.object(bundle_cards, 'rebuild') as rebuild:
+            output = self.map(('B.Tech', 'Data Analyst'), ('B.Com', 'Developer'))
+        self.assertIn('Added: 0', output)
+        self.assertIn('Removed: 0', output)
+        rebuild.assert_not_called()
+        self.assertEqual(get_version(RECOMMENDATION_CATALOG), version)
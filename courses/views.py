@@ -1,7 +1,11 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import IntegrityError, transaction
+from core.cache import cached
+from . import bundle_cards
 from .models import CourseBundle, Enrollment
+from users.models import UserSummary
 
 @login_required
 def enroll_course(request, slug):
@@ -22,8 +26,13 @@ def enroll_course(request, slug):
                 'new_course': course
             })
             
-    # Create new enrollment
-    Enrollment.objects.create(user=user, course=course, status='active')
+    # Create new enrollment (a concurrent duplicate hits one_active_enrollment_per_user)
+    try:
+        with transaction.atomic():
+            Enrollment.objects.create(user=user, course=course, status='active')
+    except IntegrityError:
+        messages.info(request, "You are already enrolled in a course.")
+        return redirect('dashboard')
     messages.success(request, f"Successfully enrolled in {course.career_title}!")
     return redirect('dashboard')
 
@@ -35,25 +44,34 @@ def change_course(request, slug):
     course = get_object_or_404(CourseBundle, slug=slug)
     user = request.user
     
-    # Deactivate current active enrollment
-    active_enrollment = Enrollment.objects.filter(user=user, status='active').first()
-    if active_enrollment:
-        active_enrollment.status = 'dropped'
-        active_enrollment.save()
-        
-    # Create new enrollment
-    Enrollment.objects.create(user=user, course=course, status='active')
+    try:
+        with transaction.atomic():
+            # Deactivate current active enrollment
+            active_enrollment = Enrollment.objects.filter(user=user, status='active').first()
+            if active_enrollment:
+                active_enrollment.status = 'dropped'
+                active_enrollment.save()
+
+            # Create new enrollment
+            Enrollment.objects.create(user=user, course=course, status='active')
+    except IntegrityError:
+        messages.error(request, "Your enrollment changed in the meantime. Please try again.")
+        return redirect('dashboard')
     messages.success(request, f"Course changed to {course.career_title}!")
     return redirect('dashboard')
 
+@cached(bundle_cards.NAMESPACE, timeout=60 * 60)
+def active_bundles():
+    # Plain dicts, not model instances: the local cache tier hands this same
+    # list to every request in the process
+    return bundle_cards.active_cards()
+
 def course_list(request):
-    courses = CourseBundle.objects.filter(is_active=True)
+    courses = active_bundles()
     active_enrollment_course_id = None
     
     if request.user.is_authenticated:
-        active_enrollment = Enrollment.objects.filter(user=request.user, status='active').first()
-        if active_enrollment:
-            active_enrollment_course_id = active_enrollment.course.id
+        active_enrollment_course_id = UserSummary.objects.for_user(request.user).active_course_id
             
     return render(request, 'courses/course_list.html', {
         'courses': courses,
@@ -1,5 +1,5 @@
 from django.shortcuts import render
-from assessments.models import Assessment
+from users.models import UserSummary
 
 def is_mobile(request):
     """Detect if the request is from a mobile device"""
@@ -10,7 +10,7 @@ def is_mobile(request):
 def index(request):
     assessment_completed = False
     if request.user.is_authenticated:
-        assessment_completed = Assessment.objects.filter(user=request.user, status='completed').exists()
+        assessment_completed = UserSummary.objects.for_user(request.user).latest_assessment_id is not None
     
     template = 'landing/index_mobile.html' if is_mobile(request) else 'landing/index.html'
     
@@ -1,3 +1,8 @@
 from django.contrib import admin
+from .models import UserRecommendation
 
-# Register your models here.
+
+@admin.register(UserRecommendation)
+class UserRecommendationAdmin(admin.ModelAdmin):
+    list_display = ('user', 'assessment', 'computed_at')
+    raw_id_fields = ('user', 'assessment')
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import m2m_changed, post_delete, post_save
 
 
 class RecommendationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recommendations'
+
+    def ready(self):
+        from assessments.models import CareerPath, CareerRequiredSkill
+        from courses.models import CourseBundle
+        from .engine import invalidate
+        for model in (CareerPath, CareerRequiredSkill, CourseBundle):
+            post_save.connect(invalidate, sender=model)
+            post_delete.connect(invalidate, sender=model)
+        m2m_changed.connect(invalidate, sender=CourseBundle.degrees.through)
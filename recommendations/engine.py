@@ -0,0 +1,295 @@
+"""
+Skill-overlap recommendation engine.
+
+Users, careers and course bundles are vectors over one skill vocabulary:
+
+* a user's weight for a skill is the share of questions tagged with it that
+  they answered correctly in their assessment;
+* a career's weights come from ``CareerRequiredSkill`` (scaled by required
+  level) and ``CareerPath.required_skills``;
+* a bundle's weights come from the skills in ``CourseBundle.skills_required``.
+
+Catalog rows are normalized to sum to 1, so ``users @ catalog.T`` is the
+share of a career's (or bundle's) requirements a user covers. Careers whose
+``min_score`` the user reached get ``MIN_SCORE_BONUS`` on top, bundles mapped
+to the user's degree ``DEGREE_BONUS``. All of it is
+SciPy sparse products over a catalog built once per catalog version;
+``top_k()`` ranks any number of users a chunk at a time.
+"""
+import hashlib
+import re
+import threading
+
+import numpy as np
+from scipy import sparse
+
+from core.cache import bump_version, get_version
+
+NAMESPACE = 'recommendations.catalog'
+
+# Weight of a required skill by CareerRequiredSkill.required_level
+LEVEL_WEIGHTS = {'basic': 1.0, 'intermediate': 2.0, 'advanced': 3.0}
+# Added to a career's score when the assessment score reaches its min_score
+MIN_SCORE_BONUS = 0.1
+# Added to a bundle's score when it is mapped to the user's degree
+DEGREE_BONUS = 0.1
+
+
+def skill_key(text):
+    """'Data Structures' and 'data_structures' are the same skill."""
+    return re.sub(r'[^a-z0-9]+', '_', text.lower()).strip('_')
+
+
+def normalize_rows(matrix):
+    """Scale each row of a sparse matrix to sum to 1 (empty rows stay empty)."""
+    totals = np.asarray(matrix.sum(axis=1)).ravel()
+    totals[totals == 0] = 1
+    return sparse.diags(1 / totals).dot(matrix).tocsr()
+
+
+def top_k(users, catalog, k, bonus=None, chunk_size=10000):
+    """
+    Rank ``catalog`` rows for each ``users`` row by weighted overlap.
+
+    ``users`` is an ``(n_users, n_skills)`` and ``catalog`` an
+    ``(n_items, n_skills)`` sparse matrix. ``bonus(start, stop)``, if given,
+    returns a dense ``(stop - start, n_items)`` block added to those users'
+    scores. Returns ``(indices, scores)``, both ``(n_users, k)`` with ``k``
+    capped at ``n_items``, best first; equal scores are ordered by catalog
+    position, including at the cut-off. Users are processed ``chunk_size`` rows at a time so only one dense score
+    block is held in memory.
+    """
+    n_users, n_items = users.shape[0], catalog.shape[0]
+    k = min(k, n_items)
+    indices = np.empty((n_users, k), dtype=np.int32)
+    scores = np.empty((n_users, k), dtype=np.float32)
+    catalog_t = catalog.T.tocsc()
+    for start in range(0, n_users, chunk_size):
+        stop = min(start + chunk_size, n_users)
+        block = users[start:stop].dot(catalog_t).toarray().astype(np.float32, copy=False)
+        if bonus is not None:
+            block += bonus(start, stop)
+        if k < n_items:
+            part = np.argpartition(-block, k - 1, axis=1)[:, :k]
+            # argpartition picks arbitrarily among items tied at the cut-off;
+            # re-select those rows with a stable sort so lower positions win
+            cutoff = np.take_along_axis(block, part, axis=1).min(axis=1)
+            ties = (block >= cutoff[:, None]).sum(axis=1) > k
+            if ties.any():
+                part[ties] = np.argsort(-block[ties], axis=1, kind='stable')[:, :k]
+        else:
+            part = np.tile(np.arange(n_items), (stop - start, 1))
+        part_scores = np.take_along_axis(block, part, axis=1)
+        order = np.lexsort((part, -part_scores), axis=1)
+        indices[start:stop] = np.take_along_axis(part, order, axis=1)
+        scores[start:stop] = np.take_along_axis(part_scores, order, axis=1)
+    return indices, scores
+
+
+class Catalog:
+    """Career and bundle skill matrices over a shared vocabulary."""
+
+    def __init__(self, careers, bundles, degree_bundles=None, version=None):
+        """
+        ``careers``: ``[(id, title, min_score, {skill: weight})]``,
+        ``bundles``: ``[(id, slug, title, {skill: weight})]``,
+        ``degree_bundles``: ``{degree_id: [bundle_id, ...]}``.
+        """
+        self.version = version
+        self.signature = hashlib.md5(
+            repr((careers, bundles, sorted((degree_bundles or {}).items()))).encode()
+        ).hexdigest()
+        vocabulary = {}
+        for *_, skills in careers + bundles:
+            for skill in skills:
+                vocabulary.setdefault(skill, len(vocabulary))
+        self.skills = vocabulary
+        self.skill_names = list(vocabulary)
+
+        self.career_ids = np.array([row[0] for row in careers], dtype=np.int64)
+        self.career_titles = [row[1] for row in careers]
+        self.career_min_scores = np.array([row[2] for row in careers], dtype=np.float32)
+        self.careers = normalize_rows(self._matrix([row[3] for row in careers]))
+
+        self.bundle_ids = np.array([row[0] for row in bundles], dtype=np.int64)
+        self.bundle_slugs = [row[1] for row in bundles]
+        self.bundle_titles = [row[2] for row in bundles]
+        self.bundles = normalize_rows(self._matrix([row[3] for row in bundles]))
+        positions = {pk: position for position, pk in enumerate(self.bundle_ids.tolist())}
+        self.degree_bundles = {
+            degree_id: np.array([positions[pk] for pk in bundle_ids if pk in positions], dtype=np.int32)
+            for degree_id, bundle_ids in (degree_bundles or {}).items()
+        }
+
+    def _matrix(self, rows):
+        data, cols, indptr = [], [], [0]
+        for skills in rows:
+            for skill, weight in skills.items():
+                cols.append(self.skills[skill])
+                data.append(weight)
+            indptr.append(len(cols))
+        return sparse.csr_matrix(
+            (np.array(data, dtype=np.float32), np.array(cols, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+            shape=(len(rows), len(self.skills)),
+        )
+
+    def user_matrix(self, proficiencies):
+        """``[{skill: share_correct}]`` -> sparse ``(n_users, n_skills)``; unknown skills are dropped."""
+        return self._matrix([
+            {skill: value for skill, value in row.items() if skill in self.skills}
+            for row in proficiencies
+        ])
+
+    def career_bonus(self, assessment_scores):
+        """``top_k`` bonus callable for careers whose ``min_score`` the user reached."""
+        assessment_scores = np.asarray(assessment_scores, dtype=np.float32)
+
+        def bonus(start, stop):
+            reached = assessment_scores[start:stop, None] >= self.career_min_scores[None, :]
+            return reached.astype(np.float32) * MIN_SCORE_BONUS
+        return bonus
+
+    def bundle_bonus(self, degree_ids):
+        """``top_k`` bonus callable for bundles mapped to the user's degree."""
+        def bonus(start, stop):
+            block = np.zeros((stop - start, len(self.bundle_ids)), dtype=np.float32)
+            for row, degree_id in enumerate(degree_ids[start:stop]):
+                positions = self.degree_bundles.get(degree_id)
+                if positions is not None:
+                    block[row, positions] = DEGREE_BONUS
+            return block
+        return bonus
+
+    def rank(self, proficiencies, assessment_scores, degree_ids, k=5, chunk_size=10000):
+        """Top-``k`` career and bundle positions (and scores) for each user."""
+        users = self.user_matrix(proficiencies)
+        careers = top_k(users, self.careers, k, self.career_bonus(assessment_scores), chunk_size)
+        bundles = top_k(users, self.bundles, k, self.bundle_bonus(degree_ids), chunk_size)
+        return careers, bundles
+
+    def skill_gaps(self, proficiency, career_position, limit=3):
+        """Highest-weighted skills of a career the user has not shown yet."""
+        row = self.careers.getrow(career_position)
+        missing = [
+            (weight, self.skill_names[col]) for col, weight in zip(row.indices, row.data)
+            if proficiency.get(self.skill_names[col], 0) < 0.5
+        ]
+        return [skill for _, skill in sorted(missing, key=lambda item: -item[0])[:limit]]
+
+
+def load_catalog(version=None):
+    """Build a ``Catalog`` from the career and bundle tables (four queries)."""
+    from assessments.models import CareerPath, CareerRequiredSkill
+    from courses.models import CourseBundle
+
+    careers = {}
+    for pk, title, min_score, required in CareerPath.objects.order_by('id').values_list(
+        'id', 'title', 'min_score', 'required_skills'
+    ):
+        skills = {skill_key(skill): 1.0 for skill in required or () if skill_key(skill)}
+        careers[pk] = (pk, title, min_score, skills)
+    for career_id, tag, level in CareerRequiredSkill.objects.values_list('career_id', 'skill_tag', 'required_level'):
+        if career_id in careers and skill_key(tag):
+            careers[career_id][3][skill_key(tag)] = LEVEL_WEIGHTS.get(level, 1.0)
+
+    bundles = []
+    for pk, slug, title, skills in CourseBundle.objects.filter(is_active=True).order_by('id').values_list(
+        'id', 'slug', 'career_title', 'skills_required'
+    ):
+        bundles.append((pk, slug, title, {skill_key(skill): 1.0 for skill in skills.split(';') if skill_key(skill)}))
+
+    degree_bundles = {}
+    links = CourseBundle.degrees.through.objects.order_by('degree_id', 'coursebundle_id')
+    for degree_id, bundle_id in links.values_list('degree_id', 'coursebundle_id'):
+        degree_bundles.setdefault(degree_id, []).append(bundle_id)
+    return Catalog(list(careers.values()), bundles, degree_bundles, version)
+
+
+_catalog = None
+_lock = threading.Lock()
+
+
+def get_catalog():
+    """Process-wide catalog, rebuilt when the ``recommendations.catalog`` version moves."""
+    global _catalog
+    version = get_version(NAMESPACE)
+    catalog = _catalog
+    if catalog is None or catalog.version != version:
+        with _lock:
+            catalog = _catalog
+            if catalog is None or catalog.version != version:
+                _catalog = catalog = load_catalog(version)
+    return catalog
+
+
+def proficiencies(assessment_ids):
+    """
+    ``{assessment_id: {skill: share_correct}}`` from graded, skill-tagged
+    responses, in one joined query.
+    """
+    from assessments.models import UserResponse
+
+    counts = {}
+    rows = UserResponse.objects.filter(
+        assessment_id__in=assessment_ids,
+        question__correct_option__isnull=False,
+    ).exclude(question__skill_tag__isnull=True).exclude(question__skill_tag='')
+    for assessment_id, tag, correct_option, selected in rows.values_list(
+        'assessment_id', 'question__skill_tag', 'question__correct_option', 'selected_option'
+    ):
+        per_skill = counts.setdefault(assessment_id, {}).setdefault(skill_key(tag), [0, 0])
+        per_skill[0] += selected == correct_option
+        per_skill[1] += 1
+    return {
+        assessment_id: {skill: right / total for skill, (right, total) in skills.items()}
+        for assessment_id, skills in counts.items()
+    }
+
+
+def recommend_many(assessments, k=5, chunk_size=10000):
+    """
+    Batch API: ``{assessment_id: {'careers': [...], 'bundles': [...], 'skills': [...]}}``
+    for ``[(assessment_id, score, degree_id)]``. Careers are ``{'id',
+    'title', 'score'}`` and bundles ``{'id', 'slug', 'title', 'score'}``
+    dicts, best first; ``skills`` are the top career's requirements the user
+    has not shown yet.
+    """
+    catalog = get_catalog()
+    assessments = list(assessments)
+    ids = [row[0] for row in assessments]
+    by_assessment = proficiencies(ids)
+    user_skills = [by_assessment.get(assessment_id, {}) for assessment_id in ids]
+    (career_pos, career_scores), (bundle_pos, bundle_scores) = catalog.rank(
+        user_skills, [row[1] for row in assessments], [row[2] for row in assessments], k, chunk_size
+    )
+
+    results = {}
+    for row, assessment_id in enumerate(ids):
+        careers = [
+            {'id': int(catalog.career_ids[pos]), 'title': catalog.career_titles[pos], 'score': round(float(score), 4)}
+            for pos, score in zip(career_pos[row], career_scores[row])
+        ]
+        bundles = [
+            {
+                'id': int(catalog.bundle_ids[pos]),
+                'slug': catalog.bundle_slugs[pos],
+                'title': catalog.bundle_titles[pos],
+                'score': round(float(score), 4),
+            }
+            for pos, score in zip(bundle_pos[row], bundle_scores[row])
+        ]
+        results[assessment_id] = {
+            'careers': careers,
+            'bundles': bundles,
+            'skills': catalog.skill_gaps(user_skills[row], career_pos[row][0]) if careers else [],
+        }
+    return results
+
+
+def recommend(assessment, k=5):
+    return recommend_many([(assessment.id, assessment.score, assessment.user.degree_id)], k)[assessment.id]
+
+
+def invalidate(**kwargs):
+    """Signal receiver for career, career-skill and bundle writes."""
+    bump_version(NAMESPACE)
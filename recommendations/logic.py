@@ -1,22 +1,20 @@
-def get_recommendations(assessment):
+from .engine import recommend
+
+
+def get_recommendations(assessment, k=5):
     """
-    Simple rule-based recommendation engine.
+    Career titles and course bundles ranked by skill overlap with the user's
+    assessment answers, plus the skills missing for the top career.
+
+    Keeps the original ``{'careers', 'skills', 'jobs'}`` shape (``jobs`` is
+    still always empty) and adds ``bundles`` (titles). See
+    ``recommendations.engine`` for scores and ids; use
+    ``engine.recommend_many`` for batches.
     """
-    score = assessment.score
-    recommendations = {
-        'careers': [],
-        'skills': [],
-        'jobs': []
+    result = recommend(assessment, k)
+    return {
+        'careers': [career['title'] for career in result['careers']],
+        'skills': result['skills'],
+        'jobs': [],
+        'bundles': [bundle['title'] for bundle in result['bundles']],
     }
-    
-    if score > 80:
-        recommendations['careers'] = ['Data Analyst', 'Software Developer']
-        recommendations['skills'] = ['Python', 'SQL', 'Data Visualization']
-    elif score > 50:
-        recommendations['careers'] = ['Digital Marketer', 'Sales Executive']
-        recommendations['skills'] = ['Communication', 'Social Media Marketing', 'Excel']
-    else:
-        recommendations['careers'] = ['Customer Support', 'Data Entry']
-        recommendations['skills'] = ['Typing', 'Basic Computer Skills', 'English']
-        
-    return recommendations
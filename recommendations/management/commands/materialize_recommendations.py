@@ -0,0 +1,117 @@
+import hashlib
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from assessments.models import Assessment
+from recommendations.engine import get_catalog, recommend_many
+from recommendations.models import UserRecommendation
+from users.models import UserSummary
+
+
+class Command(BaseCommand):
+    help = 'Compute and store top-k recommendations for users whose assessment, degree or the catalog changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Users fetched, ranked and written per chunk (default: 5000)'
+        )
+        parser.add_argument(
+            '--k',
+            type=int,
+            default=5,
+            help='Careers and bundles stored per user (default: 5)'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Recompute every user, even if their inputs are unchanged'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        k = options['k']
+        catalog = get_catalog()
+
+        # Summary rows are built on a user's first page view, so users who
+        # completed an assessment without coming back have none yet
+        backfilled = UserSummary.objects.backfill(
+            Assessment.objects.filter(status='completed', user__summary__isnull=True)
+            .values_list('user_id', flat=True).distinct()
+        )
+        if backfilled:
+            self.stdout.write(f'Built {backfilled:,} missing user summaries')
+
+        summaries = UserSummary.objects.filter(latest_assessment__isnull=False)
+        total = summaries.count()
+        self.stdout.write(f'Checking {total:,} users with a completed assessment...')
+
+        processed = 0
+        computed = 0
+        last_user_id = 0
+        start = time.perf_counter()
+        while True:
+            # Keyset pagination over the summary table's primary key
+            chunk = list(
+                summaries.filter(user_id__gt=last_user_id).order_by('user_id')
+                .values_list('user_id', 'latest_assessment_id', 'latest_score', 'user__degree_id')[:chunk_size]
+            )
+            if not chunk:
+                break
+            last_user_id = chunk[-1][0]
+
+            fingerprints = {
+                user_id: self.fingerprint(catalog.signature, k, assessment_id, score, degree_id)
+                for user_id, assessment_id, score, degree_id in chunk
+            }
+            if not options['force']:
+                stored = dict(
+                    UserRecommendation.objects.filter(user_id__in=fingerprints)
+                    .values_list('user_id', 'fingerprint')
+                )
+                chunk = [row for row in chunk if stored.get(row[0]) != fingerprints[row[0]]]
+
+            if chunk:
+                results = recommend_many(
+                    [(assessment_id, score or 0, degree_id) for _, assessment_id, score, degree_id in chunk], k
+                )
+                UserRecommendation.objects.bulk_create(
+                    [
+                        UserRecommendation(
+                            user_id=user_id,
+                            assessment_id=assessment_id,
+                            fingerprint=fingerprints[user_id],
+                            **results[assessment_id],
+                        )
+                        for user_id, assessment_id, _, _ in chunk
+                    ],
+                    update_conflicts=True,
+                    unique_fields=['user'],
+                    update_fields=['assessment', 'careers', 'bundles', 'skills', 'fingerprint', 'computed_at'],
+                )
+
+            processed += len(fingerprints)
+            computed += len(chunk)
+            self.stdout.write(f'  {processed:,}/{total:,} checked, {computed:,} recomputed')
+
+        # Users whose completed assessment went away keep no stale results
+        with transaction.atomic():
+            removed, _ = UserRecommendation.objects.filter(
+                Q(user__summary__isnull=True) | Q(user__summary__latest_assessment__isnull=True)
+            ).delete()
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Materialization complete!\n'
+            f'  Checked: {processed:,}\n'
+            f'  Recomputed: {computed:,}\n'
+            f'  Removed: {removed:,}\n'
+            f'  Elapsed: {elapsed:.2f}s'
+        ))
+
+    @staticmethod
+    def fingerprint(catalog_signature, k, assessment_id, score, degree_id):
+        return hashlib.md5(f'{catalog_signature}:{k}:{assessment_id}:{score}:{degree_id}'.encode()).hexdigest()
@@ -1,3 +1,22 @@
 from django.db import models
+from users.models import CustomUser
 
-# Create your models here.
+
+class UserRecommendation(models.Model):
+    """
+    Top-k careers and course bundles for a user, written by the
+    ``materialize_recommendations`` job and read as-is by the dashboard.
+
+    ``fingerprint`` hashes the inputs the ranking used (assessment, score,
+    degree, catalog), so the job only recomputes users whose inputs changed.
+    """
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, primary_key=True, related_name='recommendation')
+    assessment = models.ForeignKey('assessments.Assessment', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    careers = models.JSONField(default=list, blank=True)
+    bundles = models.JSONField(default=list, blank=True)
+    skills = models.JSONField(default=list, blank=True)
+    fingerprint = models.CharField(max_length=32)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Recommendations for {self.user_id}"
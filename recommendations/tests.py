@@ -1,3 +1,123 @@
-from django.test import TestCase
+from io import StringIO
 
-# Create your tests here.
+import numpy as np
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from scipy import sparse
+
+from assessments.models import Assessment, CareerPath, Question, UserResponse
+from users.models import CustomUser, UserSummary
+from .engine import DEGREE_BONUS, MIN_SCORE_BONUS, Catalog, recommend_many, top_k
+from .logic import get_recommendations
+from .models import UserRecommendation
+
+
+class MaterializeRecommendationsTests(TestCase):
+    def test_users_without_summary_are_backfilled(self):
+        CareerPath.objects.create(
+            career_id='data', title='Data Analyst', description='', min_score=0, required_skills=['SQL'],
+        )
+        question = Question.objects.create(text='Q', options=['a', 'b'], correct_option='a', skill_tag='sql')
+        user = CustomUser.objects.create_user(mobile='9000000001', password='x')
+        assessment = Assessment.objects.create(user=user, status='completed', score=100)
+        UserResponse.objects.create(assessment=assessment, question=question, selected_option='a')
+        self.assertFalse(UserSummary.objects.filter(user=user).exists())
+
+        out = StringIO()
+        call_command('materialize_recommendations', stdout=out)
+
+        self.assertIn('Built 1 missing user summaries', out.getvalue())
+        self.assertEqual(UserSummary.objects.get(user=user).latest_assessment, assessment)
+        recommendation = UserRecommendation.objects.get(user=user)
+        self.assertEqual(recommendation.careers[0]['title'], 'Data Analyst')
+
+
+class TopKTests(SimpleTestCase):
+    def rank(self, users, catalog, k, **kwargs):
+        indices, scores = top_k(sparse.csr_matrix(users), sparse.csr_matrix(catalog), k, **kwargs)
+        return indices.tolist(), np.round(scores.astype(float), 4).tolist()
+
+    def test_best_first(self):
+        catalog = [[1, 0, 0], [0, 1, 0], [0, 0, 1], [0.5, 0.5, 0]]
+        indices, scores = self.rank([[0.2, 1, 0], [0, 0, 1]], catalog, 2)
+        self.assertEqual(indices, [[1, 3], [2, 0]])
+        self.assertEqual(scores, [[1.0, 0.6], [1.0, 0.0]])
+
+    def test_ties_ordered_by_position_at_the_cut_off(self):
+        catalog = [[1, 0], [0, 1], [1, 0], [0, 1], [1, 0]]
+        indices, _ = self.rank([[1, 0], [0, 0]], catalog, 2)
+        self.assertEqual(indices, [[0, 2], [0, 1]])
+        # Same result however the users are chunked
+        self.assertEqual(self.rank([[1, 0], [0, 0]], catalog, 2, chunk_size=1)[0], indices)
+
+    def test_bonus_changes_order(self):
+        def bonus(start, stop):
+            return np.tile(np.array([0, 0.5], dtype=np.float32), (stop - start, 1))
+
+        indices, scores = self.rank([[1, 0]], [[1, 0], [0.8, 0]], 2, bonus=bonus)
+        self.assertEqual(indices, [[1, 0]])
+        self.assertEqual(scores, [[1.3, 1.0]])
+
+    def test_k_larger_than_catalog(self):
+        indices, scores = self.rank([[0, 1]], [[1, 0], [0, 1]], 5)
+        self.assertEqual(indices, [[1, 0]])
+        self.assertEqual(scores, [[1.0, 0.0]])
+
+    def test_empty_catalog_and_users(self):
+        indices, scores = top_k(sparse.csr_matrix((2, 3)), sparse.csr_matrix((0, 3)), 5)
+        self.assertEqual(indices.shape, (2, 0))
+        self.assertEqual(scores.shape, (2, 0))
+        indices, _ = top_k(sparse.csr_matrix((0, 3)), sparse.csr_matrix(np.eye(3)), 2)
+        self.assertEqual(indices.shape, (0, 2))
+
+
+class CatalogRankTests(SimpleTestCase):
+    def setUp(self):
+        self.catalog = Catalog(
+            careers=[(10, 'Analyst', 80, {'sql': 1.0, 'excel': 1.0}), (11, 'Developer', 50, {'python': 1.0})],
+            bundles=[(20, 'sql', 'SQL Bundle', {'sql': 1.0}), (21, 'py', 'Python Bundle', {'python': 1.0})],
+            degree_bundles={1: [21]},
+        )
+
+    def test_rank_applies_min_score_and_degree_bonuses(self):
+        (career_pos, career_scores), (bundle_pos, bundle_scores) = self.catalog.rank(
+            [{'sql': 1.0, 'unknown': 1.0}, {'sql': 1.0}], [90, 60], [None, 1], k=2,
+        )
+        self.assertEqual(career_pos.tolist(), [[0, 1], [0, 1]])
+        self.assertAlmostEqual(float(career_scores[0][0]), 0.5 + MIN_SCORE_BONUS, places=5)
+        self.assertAlmostEqual(float(career_scores[1][1]), MIN_SCORE_BONUS, places=5)
+        self.assertEqual(bundle_pos.tolist(), [[0, 1], [0, 1]])
+        self.assertAlmostEqual(float(bundle_scores[1][1]), DEGREE_BONUS, places=5)
+
+    def test_skill_gaps(self):
+        self.assertEqual(self.catalog.skill_gaps({'sql': 1.0}, 0), ['excel'])
+
+    def test_empty_catalog(self):
+        catalog = Catalog([], [])
+        (career_pos, _), (bundle_pos, _) = catalog.rank([{'sql': 1.0}], [50], [None], k=3)
+        self.assertEqual((career_pos.shape, bundle_pos.shape), ((1, 0), (1, 0)))
+
+
+class RecommendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        CareerPath.objects.create(career_id='data', title='Data Analyst', description='', min_score=0,
+                                  required_skills=['SQL', 'Excel'])
+        question = Question.objects.create(text='Q', options=['a', 'b'], correct_option='a', skill_tag='sql')
+        user = CustomUser.objects.create_user(mobile='9000000001', password='x')
+        self.assessment = Assessment.objects.create(user=user, status='completed', score=90)
+        UserResponse.objects.create(assessment=self.assessment, question=question, selected_option='a')
+
+    def test_recommend_many(self):
+        results = recommend_many([(self.assessment.id, 90, None), (999, 0, None)], k=3)
+        self.assertEqual([career['title'] for career in results[self.assessment.id]['careers']], ['Data Analyst'])
+        self.assertEqual(results[self.assessment.id]['skills'], ['excel'])
+        self.assertEqual(results[self.assessment.id]['bundles'], [])
+        # Assessments without graded answers still get every career
+        self.assertEqual(len(results[999]['careers']), 1)
+
+    def test_get_recommendations_keeps_the_original_shape(self):
+        self.assertEqual(get_recommendations(self.assessment), {
+            'careers': ['Data Analyst'], 'skills': ['excel'], 'jobs': [], 'bundles': [],
+        })
@@ -23,7 +23,7 @@ class CustomSocialAccountAdapter(DefaultSocialAccountAdapter):
         
         # Check if user with this email exists
         try:
-            existing_user = CustomUser.objects.get(email__iexact=email)
+            existing_user = CustomUser.objects.for_identifier(email).get()
             # Connect the social account to the existing user
             sociallogin.connect(request, existing_user)
         except CustomUser.DoesNotExist:
@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from assessments.models import Assessment
+        from courses.models import Enrollment
+        from . import signals
+
+        post_save.connect(signals.assessment_saved, sender=Assessment)
+        post_delete.connect(signals.assessment_deleted, sender=Assessment)
+        post_save.connect(signals.enrollment_changed, sender=Enrollment)
+        post_delete.connect(signals.enrollment_changed, sender=Enrollment)
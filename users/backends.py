@@ -0,0 +1,94 @@
+"""
+Password login by mobile number or email, with failed-attempt throttling.
+
+``MobileOrEmailBackend`` resolves the identifier with a single query
+(``CustomUserManager.for_identifier``) and checks the password once. Failed
+attempts are counted in the cache per identifier and per client IP; once
+either count reaches its limit (``LOGIN_MAX_FAILURES_PER_IDENTIFIER`` /
+``LOGIN_MAX_FAILURES_PER_IP`` within ``LOGIN_FAILURE_WINDOW`` seconds)
+attempts are refused before any password hashing, so credential-stuffing
+traffic cannot keep the workers busy running PBKDF2.
+
+A failed or throttled attempt raises ``PermissionDenied``, which stops
+``authenticate()`` from trying the remaining backends and hashing again.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+
+from core.cache import incr_counter
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def client_ip(request):
+    """
+    The client address. With ``USE_X_FORWARDED_FOR`` (behind nginx's
+    ``proxy_params``) it is the last X-Forwarded-For entry, the one nginx
+    itself appended, which the client can't spoof; otherwise the header is
+    ignored and ``REMOTE_ADDR`` is used.
+    """
+    if request is None:
+        return None
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if forwarded and _setting('USE_X_FORWARDED_FOR', False):
+        return forwarded.rsplit(',', 1)[-1].strip()
+    return request.META.get('REMOTE_ADDR') or None
+
+
+def _keys(identifier, ip):
+    digest = hashlib.sha256(identifier.strip().lower().encode()).hexdigest()
+    keys = [f'login:failures:id:{digest}']
+    if ip:
+        keys.append(f'login:failures:ip:{ip}')
+    return keys
+
+
+def is_throttled(request, identifier):
+    """True if logins for ``identifier`` or from this client are currently refused."""
+    keys = _keys(identifier, client_ip(request))
+    counts = cache.get_many(keys)
+    limits = [
+        _setting('LOGIN_MAX_FAILURES_PER_IDENTIFIER', 5),
+        _setting('LOGIN_MAX_FAILURES_PER_IP', 50),
+    ]
+    return any(counts.get(key, 0) >= limit for key, limit in zip(keys, limits))
+
+
+def record_failure(request, identifier):
+    window = _setting('LOGIN_FAILURE_WINDOW', 15 * 60)
+    for key in _keys(identifier, client_ip(request)):
+        incr_counter(key, window)
+
+
+def reset_failures(request, identifier):
+    # Only the identifier's count: a shared IP (office, NAT) keeps its own
+    cache.delete(_keys(identifier, None)[0])
+
+
+class MobileOrEmailBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, email=None, **kwargs):
+        # Our login form passes username=; allauth's passes email=
+        identifier = username or email or kwargs.get(get_user_model().USERNAME_FIELD)
+        if not identifier or password is None:
+            return None
+
+        if is_throttled(request, identifier):
+            raise PermissionDenied
+
+        user = get_user_model()._default_manager.for_identifier(identifier).first()
+        if user is None:
+            # Hash anyway so response time doesn't reveal whether the account exists
+            get_user_model()().set_password(password)
+        elif user.check_password(password) and self.user_can_authenticate(user):
+            reset_failures(request, identifier)
+            return user
+
+        record_failure(request, identifier)
+        raise PermissionDenied
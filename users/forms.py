@@ -1,6 +1,7 @@
 from django import forms
 from django.contrib.auth import authenticate
 from django.core.exceptions import ValidationError
+from .backends import is_throttled
 from .models import CustomUser
 
 class UserRegistrationForm(forms.ModelForm):
@@ -73,21 +74,20 @@ class UserLoginForm(forms.Form):
         'placeholder': 'Enter password'
     }))
 
+    def __init__(self, *args, request=None, **kwargs):
+        self.request = request
+        super().__init__(*args, **kwargs)
+
     def clean(self):
         cleaned_data = super().clean()
         username = cleaned_data.get('username')
         password = cleaned_data.get('password')
 
         if username and password:
-            # Check if username is mobile or email
-            if '@' in username:
-                try:
-                    user = CustomUser.objects.get(email=username)
-                    username = user.mobile
-                except CustomUser.DoesNotExist:
-                    pass
-            
-            user = authenticate(username=username, password=password)
+            # MobileOrEmailBackend resolves mobile or email itself
+            if is_throttled(self.request, username):
+                raise ValidationError("Too many failed attempts. Please try again later.")
+            user = authenticate(self.request, username=username, password=password)
             if not user:
                 raise ValidationError("Invalid credentials")
             cleaned_data['user'] = user
@@ -102,7 +102,7 @@ class ForgotPasswordForm(forms.Form):
     def clean_mobile_or_email(self):
         data = self.cleaned_data['mobile_or_email']
         if '@' in data:
-            if not CustomUser.objects.filter(email=data).exists():
+            if not CustomUser.objects.for_identifier(data).exists():
                 raise ValidationError("No user found with this email")
         else:
             if not CustomUser.objects.filter(mobile=data).exists():
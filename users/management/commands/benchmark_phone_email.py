@@ -0,0 +1,86 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from users import phone_email
+from users.phone_email_stub import start_in_thread
+from users.utils import fetch_phone_email_data
+
+
+class Command(BaseCommand):
+    help = 'Compare worker occupancy of blocking vs async Phone Email lookups against a slow local stub'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Lookups per run (default: 200)')
+        parser.add_argument('--delay', type=float, default=1.0, help='Stub response delay in seconds (default: 1.0)')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=3,
+            help='Sync workers for the blocking run, as in the gunicorn service (default: 3)'
+        )
+        parser.add_argument(
+            '--fail-rate',
+            type=float,
+            default=0.0,
+            help='Fraction of stub responses that are HTTP 503 (default: 0)'
+        )
+
+    def handle(self, *args, **options):
+        n, delay, workers = options['requests'], options['delay'], options['workers']
+        server, url = start_in_thread(port=0, delay=delay, fail_rate=options['fail_rate'])
+        self.stdout.write(f'Stub at {url}: {n:,} lookups, {delay}s upstream delay')
+
+        try:
+            # Blocking: each lookup holds a sync worker for its full duration
+            latencies = []
+
+            def blocking(_):
+                begin = time.perf_counter()
+                ok = fetch_phone_email_data(url) is not None
+                latencies.append(time.perf_counter() - begin)
+                return ok
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                ok = sum(executor.map(blocking, range(n)))
+            self.report(f'Blocking ({workers} sync workers)', n, ok, time.perf_counter() - start, latencies, sum(latencies))
+
+            # Async: one worker's event loop keeps every lookup in flight at once
+            with override_settings(PHONE_EMAIL_ALLOWED_ORIGINS=[phone_email.url_origin(url)]):
+                ok, wall, latencies, cpu = asyncio.run(self.run_async(url, n))
+            self.report('Async (1 ASGI worker)', n, ok, wall, latencies, cpu)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    async def run_async(self, url, n):
+        phone_email.get_breaker(url).record_success()
+        latencies = []
+
+        async def lookup():
+            begin = time.perf_counter()
+            data = await phone_email.fetch_user_data(url)
+            latencies.append(time.perf_counter() - begin)
+            return data is not None
+
+        cpu_start = time.thread_time()
+        start = time.perf_counter()
+        ok = sum(await asyncio.gather(*(lookup() for _ in range(n))))
+        wall = time.perf_counter() - start
+        cpu = time.thread_time() - cpu_start
+        await phone_email.close_client()
+        return ok, wall, latencies, cpu
+
+    def report(self, label, n, ok, wall, latencies, busy):
+        latencies = sorted(latencies)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        self.stdout.write(self.style.SUCCESS(
+            f'{label}\n'
+            f'  Succeeded: {ok:,}/{n:,}\n'
+            f'  Wall time: {wall:.2f}s ({n / wall:,.1f} lookups/sec)\n'
+            f'  Latency p50/p95: {statistics.median(latencies):.2f}s / {p95:.2f}s\n'
+            f'  Worker-seconds occupied: {busy:.2f}'
+        ))
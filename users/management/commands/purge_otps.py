@@ -0,0 +1,52 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from users.models import OTP
+
+
+class Command(BaseCommand):
+    help = 'Delete rows from the legacy OTP table (codes now live in the cache)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than',
+            type=int,
+            default=0,
+            metavar='MINUTES',
+            help='Only delete OTPs created more than MINUTES ago (default: 0, all rows)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Rows deleted per statement (default: 10000)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many rows would be deleted without deleting them'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        cutoff = timezone.now() - timedelta(minutes=options['older_than'])
+        stale = OTP.objects.filter(created_at__lte=cutoff)
+
+        if options['dry_run']:
+            self.stdout.write(f'Would delete {stale.count():,} OTPs created before {cutoff:%Y-%m-%d %H:%M}')
+            return
+
+        # Delete by primary-key batches so no single statement holds locks on the whole table
+        deleted = 0
+        while True:
+            ids = list(stale.order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            deleted += OTP.objects.filter(id__in=ids).delete()[0]
+            self.stdout.write(f'  Deleted {deleted:,} OTPs...')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Purge complete!\n'
+            f'  OTPs deleted: {deleted:,}\n'
+            f'  OTPs remaining: {OTP.objects.count():,}'
+        ))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from users.phone_email_stub import make_server
+
+
+class Command(BaseCommand):
+    help = 'Serve a local stand-in for the Phone Email user_json_url endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', type=str, default='127.0.0.1', help='Bind address (default: 127.0.0.1)')
+        parser.add_argument('--port', type=int, default=8765, help='Port (default: 8765)')
+        parser.add_argument(
+            '--delay',
+            type=float,
+            default=0.0,
+            help='Seconds to wait before answering each request (default: 0)'
+        )
+        parser.add_argument(
+            '--fail-rate',
+            type=float,
+            default=0.0,
+            help='Fraction of requests answered with HTTP 503 (default: 0)'
+        )
+
+    def handle(self, *args, **options):
+        server = make_server(options['host'], options['port'], options['delay'], options['fail_rate'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Phone Email stub listening on http://{options["host"]}:{options["port"]}/user.json '
+            f'(delay {options["delay"]}s, fail rate {options["fail_rate"]:.0%})'
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
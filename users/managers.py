@@ -1,4 +1,6 @@
 from django.contrib.auth.base_user import BaseUserManager
+from django.db import models
+from django.db.models.functions import Lower
 
 class CustomUserManager(BaseUserManager):
     def create_user(self, mobile=None, password=None, **extra_fields):
@@ -12,6 +14,17 @@ class CustomUserManager(BaseUserManager):
         user.save()
         return user
 
+    def for_identifier(self, identifier):
+        """
+        Users whose mobile number, or case-insensitively whose email, is
+        ``identifier``. The email comparison is on ``lower(email)`` so it uses
+        the functional unique index rather than a scan.
+        """
+        identifier = identifier.strip()
+        if '@' in identifier:
+            return self.alias(email_lower=Lower('email')).filter(email_lower=identifier.lower())
+        return self.filter(mobile=identifier)
+
     def create_superuser(self, mobile, password, **extra_fields):
         extra_fields.setdefault('is_staff', True)
         extra_fields.setdefault('is_superuser', True)
@@ -22,3 +35,66 @@ class CustomUserManager(BaseUserManager):
         if extra_fields.get('is_superuser') is not True:
             raise ValueError('Superuser must have is_superuser=True.')
         return self.create_user(mobile, password, **extra_fields)
+
+
+class UserSummaryManager(models.Manager):
+    """
+    Reads and maintains ``UserSummary`` rows.
+
+    Pages call ``for_user()``; the assessment and enrollment write paths call
+    the ``refresh_*`` methods (through signals) so the row stays current.
+    """
+
+    def for_user(self, user):
+        """The user's summary with its assessment and enrollment joined in."""
+        summary = (
+            self.select_related('latest_assessment', 'active_enrollment__course')
+            .filter(user_id=user.pk)
+            .first()
+        )
+        if summary is None:
+            # Users that predate the summary table get theirs on first read
+            summary = self.rebuild(user.pk)
+        return summary
+
+    def rebuild(self, user_id):
+        summary, _ = self.update_or_create(
+            user_id=user_id,
+            defaults={**self._assessment_fields(user_id), **self._enrollment_fields(user_id)},
+        )
+        return summary
+
+    def backfill(self, user_ids):
+        """Build the missing rows of ``user_ids``; returns how many were built."""
+        user_ids = set(user_ids)
+        missing = user_ids - set(self.filter(user_id__in=user_ids).values_list('user_id', flat=True))
+        for user_id in missing:
+            self.rebuild(user_id)
+        return len(missing)
+
+    # Refreshes only update an existing row: a missing one is built by
+    # for_user() on first read, and re-inserting here would fail while the
+    # user itself is being deleted (the receivers run during the cascade).
+    def refresh_assessment(self, user_id):
+        self.filter(user_id=user_id).update(**self._assessment_fields(user_id))
+
+    def refresh_enrollment(self, user_id):
+        self.filter(user_id=user_id).update(**self._enrollment_fields(user_id))
+
+    def _assessment_fields(self, user_id):
+        from assessments.models import Assessment
+
+        assessment = Assessment.objects.filter(user_id=user_id, status='completed').only('id', 'score').last()
+        return {
+            'latest_assessment': assessment,
+            'latest_score': assessment.score if assessment else None,
+        }
+
+    def _enrollment_fields(self, user_id):
+        from courses.models import Enrollment
+
+        enrollment = Enrollment.objects.filter(user_id=user_id, status='active').only('id', 'course_id').first()
+        return {
+            'active_enrollment': enrollment,
+            'active_course_id': enrollment.course_id if enrollment else None,
+        }
@@ -1,7 +1,8 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils.translation import gettext_lazy as _
-from .managers import CustomUserManager
+from .managers import CustomUserManager, UserSummaryManager
 
 class CustomUser(AbstractUser):
     username = None
@@ -23,10 +24,20 @@ class CustomUser(AbstractUser):
 
     objects = CustomUserManager()
 
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            # Emails are matched case-insensitively at login and social signup
+            models.UniqueConstraint(Lower('email'), name='users_customuser_email_lower_uniq'),
+        ]
+
     def __str__(self):
         return self.mobile or self.email or f"User {self.pk}"
 
 class OTP(models.Model):
+    """
+    Legacy OTP log. New codes are kept in the cache by ``users.otp``; rows
+    left here are removed with ``manage.py purge_otps``.
+    """
     mobile = models.CharField(max_length=15, db_index=True)
     otp = models.CharField(max_length=6)
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
@@ -34,3 +45,22 @@ class OTP(models.Model):
 
     def __str__(self):
         return f"{self.mobile} - {self.otp}"
+
+class UserSummary(models.Model):
+    """
+    Denormalized "current state" of a user: latest completed assessment and
+    active enrollment. Lets the dashboard, landing, assessment and course
+    pages read it in one primary-key lookup; kept current by the signal
+    receivers in users.signals.
+    """
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, primary_key=True, related_name='summary')
+    latest_assessment = models.ForeignKey('assessments.Assessment', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    latest_score = models.IntegerField(null=True, blank=True)
+    active_enrollment = models.ForeignKey('courses.Enrollment', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    active_course = models.ForeignKey('courses.CourseBundle', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = UserSummaryManager()
+
+    def __str__(self):
+        return f"Summary for {self.user_id}"
@@ -0,0 +1,68 @@
+"""
+One-time passwords kept in the cache instead of the ``OTP`` table.
+
+A code lives under one key per mobile number with ``OTP_TTL`` seconds to
+live, so issuing one is a handful of cache operations whatever
+the traffic history, and expired codes disappear on their own. Codes are
+checked by Phone Email, so this module only issues them. A resend is
+refused within ``OTP_RESEND_COOLDOWN`` seconds of the last one, and after
+``OTP_MAX_SENDS_PER_HOUR`` sends in an hour (an atomic cache counter); the
+refusal carries the seconds left until the send would be allowed.
+
+Needs a cache shared by all processes (``REDIS_URL``) in production.
+"""
+import math
+import secrets
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.cache import incr_counter
+
+
+class OTPThrottled(Exception):
+    """Too many sends for this mobile number; retry after ``retry_after`` seconds."""
+
+    def __init__(self, retry_after):
+        super().__init__(f'Try again in {retry_after} seconds')
+        self.retry_after = retry_after
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _key(kind, mobile):
+    return f'otp:{kind}:{mobile}'
+
+
+def _window(kind, mobile, seconds):
+    """
+    Start a ``seconds``-long window for ``kind`` unless one is running; return
+    ``(started, ends_at)`` with ``ends_at`` a Unix timestamp.
+    """
+    key = _key(f'{kind}_until', mobile)
+    ends_at = time.time() + seconds
+    if cache.add(key, ends_at, timeout=seconds):
+        return True, ends_at
+    return False, cache.get(key, ends_at)
+
+
+def _retry_after(ends_at):
+    return max(1, math.ceil(ends_at - time.time()))
+
+
+def issue(mobile):
+    """Create a new code for ``mobile`` and return it, or raise ``OTPThrottled``."""
+    started, ends_at = _window('cooldown', mobile, _setting('OTP_RESEND_COOLDOWN', 30))
+    if not started:
+        raise OTPThrottled(_retry_after(ends_at))
+    # The counter and its window end are both created by the window's first send
+    _, ends_at = _window('sends', mobile, 60 * 60)
+    if incr_counter(_key('sends', mobile), 60 * 60) > _setting('OTP_MAX_SENDS_PER_HOUR', 5):
+        raise OTPThrottled(_retry_after(ends_at))
+
+    code = f'{secrets.randbelow(900000) + 100000}'
+    cache.set(_key('code', mobile), code, timeout=_setting('OTP_TTL', 300))
+    return code
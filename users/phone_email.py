@@ -0,0 +1,187 @@
+"""
+Async client for the Phone Email ``user_json_url`` lookup.
+
+``fetch_user_data()`` is awaited by the async ``phone_email_callback`` view,
+so while the provider is slow the worker keeps serving other requests
+instead of blocking on a socket. Under ASGI (``career_upskill.asgi``) each
+worker process runs one event loop and shares one ``httpx.AsyncClient``:
+
+* connections to the provider are pooled and kept alive
+  (``PHONE_EMAIL_MAX_CONNECTIONS``);
+* connect and read timeouts are strict (``PHONE_EMAIL_CONNECT_TIMEOUT``,
+  ``PHONE_EMAIL_READ_TIMEOUT``);
+* transport errors, 429 and 5xx responses are retried
+  ``PHONE_EMAIL_RETRIES`` times with exponential backoff and jitter;
+* after ``PHONE_EMAIL_BREAKER_THRESHOLD`` consecutive failed lookups the
+  circuit opens and lookups fail fast for ``PHONE_EMAIL_BREAKER_RESET``
+  seconds, after which a single trial lookup decides whether it closes.
+
+The URL comes from the browser, so only URLs on one of
+``PHONE_EMAIL_ALLOWED_ORIGINS`` are fetched (the view answers 400 to anything
+else) and each origin has its own breaker: a client pointing the callback at
+a dead host can neither open the provider's circuit nor use the retries
+against arbitrary hosts.
+"""
+import asyncio
+import logging
+import random
+import time
+import weakref
+from urllib.parse import urlsplit
+
+import httpx
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a half-open trial call."""
+
+    def __init__(self, threshold, reset_after):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        state = self.state
+        if state == 'closed':
+            return True
+        if state == 'half-open' and not self.trial_running:
+            self.trial_running = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.trial_running or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+        self.trial_running = False
+
+
+_breakers = {}
+
+
+def url_origin(url):
+    """``scheme://host[:port]`` of ``url``, or None if it isn't an absolute http(s) URL."""
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return None
+    if parts.scheme not in ('http', 'https') or not parts.hostname or parts.username or parts.password:
+        return None
+    origin = f'{parts.scheme}://{parts.hostname.lower()}'
+    return f'{origin}:{port}' if port else origin
+
+
+def is_allowed_url(url):
+    """True if ``url`` is on one of the Phone Email origins we are willing to fetch from."""
+    origin = url_origin(url)
+    allowed = _setting('PHONE_EMAIL_ALLOWED_ORIGINS', ['https://user.phone.email'])
+    return origin is not None and origin in {entry.rstrip('/').lower() for entry in allowed}
+
+
+def get_breaker(url):
+    """The circuit breaker of ``url``'s origin."""
+    origin = url_origin(url)
+    breaker = _breakers.get(origin)
+    if breaker is None:
+        breaker = _breakers.setdefault(origin, CircuitBreaker(
+            threshold=_setting('PHONE_EMAIL_BREAKER_THRESHOLD', 5),
+            reset_after=_setting('PHONE_EMAIL_BREAKER_RESET', 30),
+        ))
+    return breaker
+
+
+# An AsyncClient is bound to the loop it was first used on; ASGI servers run
+# one loop per process, but tests and async_to_sync() create their own.
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_client():
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                _setting('PHONE_EMAIL_READ_TIMEOUT', 5),
+                connect=_setting('PHONE_EMAIL_CONNECT_TIMEOUT', 3),
+            ),
+            limits=httpx.Limits(
+                max_connections=_setting('PHONE_EMAIL_MAX_CONNECTIONS', 50),
+                max_keepalive_connections=_setting('PHONE_EMAIL_MAX_CONNECTIONS', 50),
+            ),
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_client():
+    """Close this loop's client (for benchmarks and shutdown hooks)."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def fetch_user_data(user_json_url):
+    """
+    Fetch user data from a Phone Email JSON URL.
+    Returns a dictionary with user info or None if failed.
+    """
+    if not is_allowed_url(user_json_url):
+        logger.warning('Refusing Phone Email lookup outside the allowed origins: %s', user_json_url)
+        return None
+
+    breaker = get_breaker(user_json_url)
+    if not breaker.allow():
+        logger.warning('Phone Email circuit open; skipping lookup')
+        return None
+
+    client = get_client()
+    retries = _setting('PHONE_EMAIL_RETRIES', 2)
+    backoff = _setting('PHONE_EMAIL_BACKOFF', 0.2)
+    for attempt in range(retries + 1):
+        try:
+            response = await client.get(user_json_url)
+            if response.status_code not in RETRY_STATUSES:
+                response.raise_for_status()
+                data = response.json()
+                breaker.record_success()
+                return data
+            error = f'HTTP {response.status_code}'
+        except httpx.TransportError as e:
+            error = repr(e)
+        except (httpx.HTTPStatusError, ValueError) as e:
+            # 4xx or a malformed body: retrying won't help, and it isn't the provider being down
+            logger.warning('Phone Email lookup failed: %s', e)
+            breaker.record_success()
+            return None
+
+        if attempt < retries:
+            await asyncio.sleep(backoff * 2 ** attempt * (0.5 + random.random()))
+
+    logger.warning('Phone Email lookup failed after %d attempts: %s', retries + 1, error)
+    breaker.record_failure()
+    return None
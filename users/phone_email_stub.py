@@ -0,0 +1,64 @@
+"""
+Local stand-in for the Phone Email ``user_json_url`` endpoint.
+
+Every GET answers with a verified-user JSON body after ``delay`` seconds, or
+with a 503 for a ``fail_rate`` fraction of requests, so the callback's
+timeouts, retries and circuit breaker can be exercised without the real
+provider. Point the callback at it with
+``/auth/phone-email-callback/?user_json_url=http://127.0.0.1:8765/user.json``
+after adding ``http://127.0.0.1:8765`` to ``PHONE_EMAIL_ALLOWED_ORIGINS``
+(see ``manage.py run_phone_email_stub``).
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def make_server(host='127.0.0.1', port=8765, delay=0.0, fail_rate=0.0):
+    """A ``ThreadingHTTPServer`` for the stub; call ``serve_forever()`` on it."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            time.sleep(delay)
+            if random.random() < fail_rate:
+                self._reply(503, {'error': 'stub failure'})
+                return
+            query = parse_qs(urlparse(self.path).query)
+            self._reply(200, {
+                'user_country_code': '91',
+                'user_phone_number': query.get('phone', ['9999999999'])[0],
+                'user_email_id': query.get('email', ['stub@example.com'])[0],
+                'user_first_name': 'Stub',
+                'user_last_name': 'User',
+            })
+
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        # The default listen backlog of 5 would queue a burst of concurrent clients
+        request_queue_size = 1024
+
+    return Server((host, port), Handler)
+
+
+def start_in_thread(**kwargs):
+    """Start a stub server on a background thread; returns ``(server, base_url)``."""
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f'http://{host}:{port}/user.json'
@@ -0,0 +1,16 @@
+from .models import UserSummary
+
+
+def assessment_saved(sender, instance, created=False, **kwargs):
+    # Pending assessments never change the summary
+    if instance.status == 'completed':
+        UserSummary.objects.refresh_assessment(instance.user_id)
+
+
+def assessment_deleted(sender, instance, **kwargs):
+    if instance.status == 'completed':
+        UserSummary.objects.refresh_assessment(instance.user_id)
+
+
+def enrollment_changed(sender, instance, **kwargs):
+    UserSummary.objects.refresh_enrollment(instance.user_id)
@@ -1,3 +1,309 @@
-from django.test import TestCase
+import asyncio
+import time
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+import httpx
+from django.contrib.auth import authenticate
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from assessments.models import Assessment
+from courses.models import CourseBundle, Enrollment
+from . import otp, phone_email, phone_email_stub
+from .backends import client_ip
+from .models import CustomUser, UserSummary
+
+
+class UserSummarySignalTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(mobile='9000000001', email='a@example.com', password='pw')
+        self.course = CourseBundle.objects.create(
+            career_title='Data Analyst', skills_required='SQL; Excel', duration='3 months',
+            original_price=100, discounted_price=80, next_batch_date=date(2026, 1, 1),
+        )
+
+    def test_for_user_builds_missing_row(self):
+        assessment = Assessment.objects.create(user=self.user, status='completed', score=70)
+        summary = UserSummary.objects.for_user(self.user)
+        self.assertEqual(summary.latest_assessment_id, assessment.id)
+        self.assertEqual(summary.latest_score, 70)
+
+    def test_signals_refresh_existing_row(self):
+        UserSummary.objects.for_user(self.user)
+        assessment = Assessment.objects.create(user=self.user, status='completed', score=55)
+        enrollment = Enrollment.objects.create(user=self.user, course=self.course, status='active')
+        summary = UserSummary.objects.get(user=self.user)
+        self.assertEqual(summary.latest_assessment_id, assessment.id)
+        self.assertEqual(summary.active_enrollment_id, enrollment.id)
+        self.assertEqual(summary.active_course_id, self.course.id)
+
+        enrollment.status = 'dropped'
+        enrollment.save()
+        assessment.delete()
+        summary.refresh_from_db()
+        self.assertIsNone(summary.active_enrollment_id)
+        self.assertIsNone(summary.latest_assessment_id)
+
+    def test_pending_assessment_does_not_change_summary(self):
+        UserSummary.objects.for_user(self.user)
+        Assessment.objects.create(user=self.user, status='pending')
+        self.assertIsNone(UserSummary.objects.get(user=self.user).latest_assessment_id)
+
+    def test_delete_user_with_assessment_and_enrollment(self):
+        Assessment.objects.create(user=self.user, status='completed', score=70)
+        Enrollment.objects.create(user=self.user, course=self.course, status='active')
+        UserSummary.objects.for_user(self.user)
+
+        self.user.delete()
+
+        self.assertFalse(CustomUser.objects.filter(mobile='9000000001').exists())
+        self.assertFalse(UserSummary.objects.exists())
+        self.assertFalse(Enrollment.objects.exists())
+
+
+USER_JSON_URL = 'https://user.phone.email/user_abc.json'
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def test_closed_open_half_open_closed(self):
+        breaker = phone_email.CircuitBreaker(threshold=2, reset_after=30)
+        with mock.patch('users.phone_email.time.monotonic', return_value=100.0):
+            breaker.record_failure()
+            self.assertEqual(breaker.state, 'closed')
+            breaker.record_failure()
+            self.assertEqual(breaker.state, 'open')
+            self.assertFalse(breaker.allow())
+        with mock.patch('users.phone_email.time.monotonic', return_value=130.0):
+            self.assertEqual(breaker.state, 'half-open')
+            # A single trial lookup at a time
+            self.assertTrue(breaker.allow())
+            self.assertFalse(breaker.allow())
+            breaker.record_success()
+            self.assertEqual(breaker.state, 'closed')
+            self.assertTrue(breaker.allow())
+
+    def test_failed_trial_reopens(self):
+        breaker = phone_email.CircuitBreaker(threshold=5, reset_after=30)
+        with mock.patch('users.phone_email.time.monotonic', return_value=100.0):
+            for _ in range(5):
+                breaker.record_failure()
+        with mock.patch('users.phone_email.time.monotonic', return_value=130.0):
+            self.assertTrue(breaker.allow())
+            breaker.record_failure()
+            self.assertEqual(breaker.state, 'open')
+
+
+@override_settings(
+    PHONE_EMAIL_RETRIES=2, PHONE_EMAIL_BACKOFF=0.2,
+    PHONE_EMAIL_BREAKER_THRESHOLD=2, PHONE_EMAIL_BREAKER_RESET=30,
+)
+class FetchUserDataTests(SimpleTestCase):
+    def setUp(self):
+        phone_email._breakers.clear()
+        self.addCleanup(phone_email._breakers.clear)
+
+    def fetch(self, handler, url=USER_JSON_URL):
+        """Run fetch_user_data against ``handler``; returns ``(data, requests, backoff delays)``."""
+        requests = []
+
+        def record(request):
+            requests.append(request)
+            return handler(request)
+
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(record)) as client:
+                with mock.patch.object(phone_email, 'get_client', return_value=client), \
+                        mock.patch.object(phone_email.asyncio, 'sleep', new=mock.AsyncMock()) as sleep, \
+                        mock.patch.object(phone_email.random, 'random', return_value=0.5):
+                    data = await phone_email.fetch_user_data(url)
+            return data, [call.args[0] for call in sleep.await_args_list]
+
+        data, delays = asyncio.run(run())
+        return data, requests, delays
+
+    def test_success(self):
+        data, requests, delays = self.fetch(lambda request: httpx.Response(200, json={'user_phone_number': '9'}))
+        self.assertEqual(data, {'user_phone_number': '9'})
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(delays, [])
+
+    def test_retries_with_backoff_then_succeeds(self):
+        responses = iter([httpx.Response(503), httpx.Response(429), httpx.Response(200, json={'ok': True})])
+        data, requests, delays = self.fetch(lambda request: next(responses))
+        self.assertEqual(data, {'ok': True})
+        self.assertEqual(len(requests), 3)
+        # backoff * 2 ** attempt, times the jitter factor (0.5 + 0.5)
+        self.assertEqual(delays, [0.2, 0.4])
+        self.assertEqual(phone_email.get_breaker(USER_JSON_URL).failures, 0)
+
+    def test_timeouts_are_retried_and_count_as_one_failure(self):
+        def timeout(request):
+            raise httpx.ReadTimeout('timed out', request=request)
+
+        data, requests, _ = self.fetch(timeout)
+        self.assertIsNone(data)
+        self.assertEqual(len(requests), 3)
+        self.assertEqual(phone_email.get_breaker(USER_JSON_URL).failures, 1)
+
+    def test_client_errors_are_not_retried(self):
+        data, requests, delays = self.fetch(lambda request: httpx.Response(404))
+        self.assertIsNone(data)
+        self.assertEqual((len(requests), delays), (1, []))
+        self.assertEqual(phone_email.get_breaker(USER_JSON_URL).state, 'closed')
+
+    def test_open_breaker_fails_fast_per_origin(self):
+        for _ in range(2):
+            self.fetch(lambda request: httpx.Response(500))
+        data, requests, _ = self.fetch(lambda request: httpx.Response(200, json={}))
+        self.assertIsNone(data)
+        self.assertEqual(requests, [])
+
+        # Another allowed origin has a breaker of its own
+        with self.settings(PHONE_EMAIL_ALLOWED_ORIGINS=['https://user.phone.email', 'https://backup.phone.email']):
+            data, _, _ = self.fetch(lambda request: httpx.Response(200, json={'ok': True}),
+                                    url='https://backup.phone.email/user.json')
+        self.assertEqual(data, {'ok': True})
+
+    def test_disallowed_url_is_not_fetched(self):
+        data, requests, _ = self.fetch(lambda request: httpx.Response(200, json={}), url='http://10.0.0.1/x.json')
+        self.assertIsNone(data)
+        self.assertEqual(requests, [])
+        self.assertFalse(phone_email._breakers)
+
+    def test_against_local_stub(self):
+        server, url = phone_email_stub.start_in_thread(port=0)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        async def run():
+            try:
+                return await phone_email.fetch_user_data(f'{url}?phone=9000000001')
+            finally:
+                await phone_email.close_client()
+
+        with self.settings(PHONE_EMAIL_ALLOWED_ORIGINS=[phone_email.url_origin(url)]):
+            data = asyncio.run(run())
+        self.assertEqual(data['user_phone_number'], '9000000001')
+
+
+class PhoneEmailCallbackTests(TestCase):
+    async def test_registration_completes_with_fetched_data(self):
+        session = await self.async_client.asession()
+        session['verification_type'] = 'registration'
+        session['registration_data'] = {
+            'full_name': 'New User', 'mobile': '9000000009', 'email': 'new@example.com', 'password': 'pw',
+        }
+        await session.asave()
+
+        fetched = {'user_phone_number': '+919000000009'}
+        with mock.patch.object(phone_email, 'fetch_user_data', new=mock.AsyncMock(return_value=fetched)) as fetch:
+            response = await self.async_client.get('/auth/phone-email-callback/', {'user_json_url': USER_JSON_URL})
+        fetch.assert_awaited_once_with(USER_JSON_URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'success')
+        self.assertTrue(await CustomUser.objects.filter(mobile='9000000009', is_verified=True).aexists())
+
+    async def test_failed_lookup(self):
+        with mock.patch.object(phone_email, 'fetch_user_data', new=mock.AsyncMock(return_value=None)):
+            response = await self.async_client.get('/auth/phone-email-callback/', {'user_json_url': USER_JSON_URL})
+        self.assertEqual(response.status_code, 500)
+
+    def test_rejects_urls_outside_allowed_origins(self):
+        for url in ('http://10.0.0.1/user.json', 'https://user.phone.email.evil.com/x.json',
+                    'https://attacker@user.phone.email/x.json', 'file:///etc/passwd'):
+            response = self.client.get('/auth/phone-email-callback/', {'user_json_url': url})
+            self.assertEqual(response.status_code, 400, url)
+        self.assertFalse(phone_email._breakers)
+
+    def test_allowed_origin(self):
+        self.assertTrue(phone_email.is_allowed_url('https://user.phone.email/user_abc.json'))
+        self.assertTrue(phone_email.is_allowed_url('https://USER.phone.email/user_abc.json'))
+        self.assertFalse(phone_email.is_allowed_url('http://user.phone.email/user_abc.json'))
+
+
+@override_settings(
+    LOGIN_MAX_FAILURES_PER_IDENTIFIER=3, LOGIN_MAX_FAILURES_PER_IP=5,
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class MobileOrEmailBackendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(mobile='9000000001', email='a@example.com', password='pw')
+
+    def login(self, identifier, password, ip='10.0.0.1', **meta):
+        request = RequestFactory().post('/auth/login/', REMOTE_ADDR=ip, **meta)
+        return authenticate(request, username=identifier, password=password)
+
+    def test_login_by_mobile_or_email(self):
+        self.assertEqual(self.login('9000000001', 'pw'), self.user)
+        self.assertEqual(self.login('A@Example.com', 'pw'), self.user)
+        self.assertIsNone(self.login('a@example.com', 'wrong'))
+
+    def test_identifier_throttled_after_failures(self):
+        for _ in range(3):
+            self.assertIsNone(self.login('a@example.com', 'wrong'))
+        # Refused without checking the (correct) password
+        self.assertIsNone(self.login('a@example.com', 'pw'))
+        # Other clients are refused too: the count is per identifier
+        self.assertIsNone(self.login('a@example.com', 'pw', ip='10.0.0.2'))
+
+    def test_success_resets_identifier_failures(self):
+        for _ in range(2):
+            self.login('a@example.com', 'wrong')
+        self.assertEqual(self.login('a@example.com', 'pw'), self.user)
+        for _ in range(2):
+            self.login('a@example.com', 'wrong')
+        self.assertEqual(self.login('a@example.com', 'pw'), self.user)
+
+    def test_ip_throttled_across_identifiers(self):
+        for n in range(5):
+            self.login(f'nobody{n}@example.com', 'wrong')
+        self.assertIsNone(self.login('a@example.com', 'pw'))
+        self.assertEqual(self.login('a@example.com', 'pw', ip='10.0.0.2'), self.user)
+
+    def test_forwarded_for_ignored_unless_enabled(self):
+        request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='1.2.3.4, 5.6.7.8')
+        self.assertEqual(client_ip(request), '10.0.0.1')
+        with self.settings(USE_X_FORWARDED_FOR=True):
+            self.assertEqual(client_ip(request), '5.6.7.8')
+
+
+@override_settings(OTP_RESEND_COOLDOWN=30, OTP_MAX_SENDS_PER_HOUR=2)
+class OTPThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = time.time()
+
+    def at(self, seconds):
+        return mock.patch('users.otp.time.time', return_value=self.now + seconds)
+
+    def test_resend_cooldown_reports_remaining_seconds(self):
+        with self.at(0):
+            self.assertEqual(len(otp.issue('9000000001')), 6)
+        with self.at(12):
+            with self.assertRaises(otp.OTPThrottled) as throttled:
+                otp.issue('9000000001')
+        self.assertEqual(throttled.exception.retry_after, 18)
+        # Other numbers have their own cooldown
+        otp.issue('9000000002')
+
+    def test_hourly_limit_reports_remaining_seconds(self):
+        for seconds in (0, 100):
+            with self.at(seconds):
+                otp.issue('9000000001')
+            cache.delete('otp:cooldown_until:9000000001')
+        with self.at(600):
+            with self.assertRaises(otp.OTPThrottled) as throttled:
+                otp.issue('9000000001')
+        self.assertEqual(throttled.exception.retry_after, 60 * 60 - 600)
+
+    def test_resent_otp_is_only_logged_at_debug(self):
+        session = self.client.session
+        session['verify_mobile'] = '9000000001'
+        session.save()
+        with mock.patch('builtins.print') as printed, self.assertLogs('users.views', 'DEBUG') as logs:
+            response = self.client.get('/auth/resend-otp/')
+        self.assertRedirects(response, '/auth/login/', fetch_redirect_response=False)
+        printed.assert_not_called()
+        self.assertEqual([record.levelname for record in logs.records], ['DEBUG'])
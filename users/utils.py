@@ -4,11 +4,15 @@ from django.conf import settings
 
 def fetch_phone_email_data(user_json_url):
     """
-    Fetches user data from Phone Email JSON URL.
+    Fetches user data from Phone Email JSON URL (blocking).
     Returns a dictionary with user info or None if failed.
+
+    The callback view uses the async, pooled ``users.phone_email`` client;
+    this is kept for sync callers and as the benchmark baseline.
     """
+    timeout = getattr(settings, 'PHONE_EMAIL_CONNECT_TIMEOUT', 3) + getattr(settings, 'PHONE_EMAIL_READ_TIMEOUT', 5)
     try:
-        with urllib.request.urlopen(user_json_url) as url:
+        with urllib.request.urlopen(user_json_url, timeout=timeout) as url:
             data = json.loads(url.read().decode())
             return data
     except Exception as e:
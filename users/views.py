@@ -1,17 +1,20 @@
-import random
+import logging
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils import timezone
 from datetime import timedelta
-from .models import CustomUser, OTP
+from .models import CustomUser, UserSummary
+from . import otp
 from .forms import UserRegistrationForm, UserLoginForm, ForgotPasswordForm, ResetPasswordForm, ProfileUpdateForm
-from django.db.models import Q
-from .utils import fetch_phone_email_data
+from . import phone_email
+from core.autocomplete import shard_urls
+from recommendations.models import UserRecommendation
 
-def generate_otp():
-    return str(random.randint(100000, 999999))
+logger = logging.getLogger(__name__)
 
 def register_view(request):
     if request.method == 'POST':
@@ -57,16 +60,26 @@ def verify_registration_otp(request):
     response['Cross-Origin-Opener-Policy'] = 'same-origin-allow-popups'
     return response
 
-def phone_email_callback(request):
-    """Handle the user_json_url from Phone Email"""
+async def phone_email_callback(request):
+    """
+    Handle the user_json_url from Phone Email. The provider lookup is awaited
+    so a slow provider doesn't hold a worker; the session and database work
+    runs in a thread afterwards.
+    """
     user_json_url = request.GET.get('user_json_url')
     if not user_json_url:
         return JsonResponse({'status': 'error', 'message': 'No URL provided'}, status=400)
+    if not phone_email.is_allowed_url(user_json_url):
+        return JsonResponse({'status': 'error', 'message': 'Invalid URL'}, status=400)
 
-    data = fetch_phone_email_data(user_json_url)
+    data = await phone_email.fetch_user_data(user_json_url)
     if not data:
         return JsonResponse({'status': 'error', 'message': 'Failed to fetch user data'}, status=500)
 
+    return await sync_to_async(complete_phone_verification)(request, data)
+
+def complete_phone_verification(request, data):
+    """Finish registration or password reset with the verified Phone Email data."""
     verification_type = request.session.get('verification_type')
     
     if verification_type == 'registration':
@@ -99,7 +112,7 @@ def phone_email_callback(request):
             user.is_verified = True
             user.save()
             
-            login(request, user, backend='django.contrib.auth.backends.ModelBackend')
+            login(request, user, backend='users.backends.MobileOrEmailBackend')
             
             # Clear session
             del request.session['registration_data']
@@ -125,7 +138,7 @@ def phone_email_callback(request):
                         'status': 'error', 
                         'message': f'Verification failed: Verified email ({verified_email}) does not match requested email ({reset_identifier}).'
                     }, status=400)
-                user = CustomUser.objects.get(email=reset_identifier)
+                user = CustomUser.objects.for_identifier(reset_identifier).get()
             else:
                 # Mobile verification case
                 norm_verified = ''.join(filter(str.isdigit, verified_phone))[-10:] if verified_phone else ""
@@ -152,12 +165,15 @@ def resend_otp_view(request):
         messages.error(request, "Session expired. Please start over.")
         return redirect('register')
         
-    # Generate new OTP
-    otp_code = generate_otp()
-    OTP.objects.create(mobile=mobile, otp=otp_code)
-    print(f"Resent OTP for {mobile}: {otp_code}") # For dev
-    
-    messages.success(request, "A new OTP has been sent to your mobile number.")
+    # Generate new OTP (kept in the cache with a TTL; see users.otp)
+    try:
+        otp_code = otp.issue(mobile)
+    except otp.OTPThrottled as e:
+        messages.error(request, f"Too many OTP requests. Please try again in {e.retry_after} seconds.")
+    else:
+        # No SMS gateway yet: in development read the code from the DEBUG log
+        logger.debug('Resent OTP for %s: %s', mobile, otp_code)
+        messages.success(request, "A new OTP has been sent to your mobile number.")
     
     # Determine where to redirect based on referer or session
     # For now, default to verify_registration_otp if registration_data exists
@@ -168,7 +184,7 @@ def resend_otp_view(request):
 
 def login_view(request):
     if request.method == 'POST':
-        form = UserLoginForm(request.POST)
+        form = UserLoginForm(request.POST, request=request)
         if form.is_valid():
             user = form.cleaned_data['user']
             login(request, user)
@@ -238,23 +254,21 @@ def logout_view(request):
     logout(request)
     return redirect('index')
 
-from assessments.models import Assessment
-from courses.models import Enrollment
 
 @login_required
 def dashboard_view(request):
     user = request.user
-    # Get completed assessment
-    assessment = Assessment.objects.filter(user=user, status='completed').last()
-    
-    # Get active enrollment
-    active_enrollment = Enrollment.objects.filter(user=user, status='active').first()
+    # Completed assessment and active enrollment, from one summary lookup
+    summary = UserSummary.objects.for_user(user)
+    assessment = summary.latest_assessment
+    active_enrollment = summary.active_enrollment
     
-    # Get recommended courses if assessment done but no active enrollment
+    # Bundles stored by materialize_recommendations, shown until the user enrolls
     recommended_courses = []
     if assessment and not active_enrollment:
-        # Assuming result_data has recommended_courses list
-        recommended_courses = assessment.result_data.get('recommended_courses', [])
+        recommended_courses = (
+            UserRecommendation.objects.filter(user_id=user.pk).values_list('bundles', flat=True).first() or []
+        )
         
     return render(request, 'users/dashboard.html', {
         'user': user,
@@ -277,7 +291,7 @@ def profile_view(request):
             messages.success(request, 'Profile updated successfully!')
             
             # Check if assessment is completed
-            if Assessment.objects.filter(user=user, status='completed').exists():
+            if UserSummary.objects.for_user(user).latest_assessment_id:
                 return redirect('dashboard')
             else:
                 return redirect('start_assessment')
@@ -296,16 +310,20 @@ def profile_view(request):
     return render(request, 'users/profile.html', {
         'form': form,
         'completion_percentage': completion_percentage,
-        'user': user  # Pass prefetched user to avoid extra queries in template
+        'user': user,  # Pass prefetched user to avoid extra queries in template
+        'autocomplete_shards': shard_urls(),  # None until build_autocomplete_shards has run
     })
 
 from django.http import JsonResponse
+from core.cache import cached_json_view
 from core.models import Degree
+from core.search import ranked_search
 
+@cached_json_view('core.degree')
 def search_degrees(request):
     query = request.GET.get('q', '')
     if len(query) >= 1:
-        degrees = Degree.objects.filter(Q(name__icontains=query) | Q(full_name__icontains=query))[:10]
+        degrees = ranked_search(Degree.objects.all(), ['name', 'full_name'], query)[:10]
         results = [{'id': d.id, 'name': f"{d.name} - {d.full_name}"} for d in degrees]
     else:
         # Return all degrees when no query (for dropdown)